@@ -5,10 +5,10 @@
 用于测试和验证算法的正确性和性能。
 """
 
+import sys
 import time
-import random
-import math
-from typing import List, Tuple
+import numpy as np
+from typing import List, Optional, Tuple
 from eco_exoskeleton.data_processing import (
     ProcessingResult, MovingAverageFilter, KalmanFilter, OutlierDetector, TrendAnalyzer, StatisticalAnalyzer, DataFusionProcessor, AdaptiveFilter
 )
@@ -16,28 +16,46 @@ from eco_exoskeleton.algorithm_manager import get_algorithm_manager, AlgorithmCo
 from eco_exoskeleton.sensor_collector import get_sensor_collector
 from eco_exoskeleton.log_manager import setup_logging
 
-def generate_test_data(length: int = 100) -> List[Tuple[float, float]]:
-    """生成测试数据 (时间戳, 数值)"""
-    data = []
-    base_time = time.time()
-    
-    for i in range(length):
-        # 生成带噪声和趋势的数据
-        timestamp = base_time + i
-        trend = 0.1 * i  # 线性增长趋势
-        noise = random.gauss(0, 0.5)  # 高斯噪声
-        seasonal = 2 * math.sin(2 * math.pi * i / 20)  # 季节性变化
-        
-        # 添加一些异常值
-        if random.random() < 0.05:  # 5%的异常值概率
-            outlier = random.choice([5, -5])
-            value = 25 + trend + seasonal + noise + outlier
-        else:
-            value = 25 + trend + seasonal + noise
-        
-        data.append((timestamp, value))
-    
-    return data
+def generate_test_data(length: int = 100, seed: Optional[int] = None) -> List[Tuple[float, float]]:
+    """生成测试数据 (时间戳, 数值)，指定 seed 时数值序列可复现"""
+    rng = np.random.default_rng(seed)
+    index = np.arange(length)
+    
+    # 生成带噪声和趋势的数据
+    timestamps = time.time() + index
+    trend = 0.1 * index  # 线性增长趋势
+    noise = rng.normal(0, 0.5, length)  # 高斯噪声
+    seasonal = 2 * np.sin(2 * np.pi * index / 20)  # 季节性变化
+    
+    # 添加一些异常值 (5%的异常值概率)
+    outliers = np.where(rng.random(length) < 0.05, rng.choice([5, -5], length), 0)
+    
+    values = 25 + trend + seasonal + noise + outliers
+    return list(zip(timestamps.tolist(), values.tolist()))
+
+def _format_times(timestamps: List[float]) -> List[str]:
+    """批量将时间戳格式化为 %H:%M:%S
+    
+    只对第一个时间戳调用一次 localtime，其余时间按与它的秒数差推算。
+    """
+    if not timestamps:
+        return []
+    
+    base = int(timestamps[0])
+    hour, minute, second = time.localtime(base)[3:6]
+    base_seconds = hour * 3600 + minute * 60 + second
+    
+    time_strs = []
+    for timestamp in timestamps:
+        seconds = (base_seconds + int(timestamp) - base) % 86400
+        time_strs.append(f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}")
+    return time_strs
+
+def _write_lines(lines: List[str]):
+    """一次性输出演示结果，避免在处理循环中逐行写终端"""
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
 
 def demo_moving_average():
     """演示移动平均滤波器"""
@@ -53,12 +71,16 @@ def demo_moving_average():
     print("时间戳\t\t原始值\t窗口3\t窗口10")
     print("-" * 60)
     
-    for timestamp, value in test_data:
-        result_3 = filter_3.process(value)
-        result_10 = filter_10.process(value)
-        
-        time_str = time.strftime('%H:%M:%S', time.localtime(timestamp))
-        print(f"{time_str}\t{value:.2f}\t{result_3.processed_value:.2f}\t{result_10.processed_value:.2f}")
+    values = [value for _, value in test_data]
+    processed_3 = filter_3.process_batch(values)
+    processed_10 = filter_10.process_batch(values)
+    
+    lines = []
+    time_strs = _format_times([timestamp for timestamp, _ in test_data])
+    for time_str, value, value_3, value_10 in zip(time_strs, values, processed_3, processed_10):
+        lines.append(f"{time_str}\t{value:.2f}\t{value_3:.2f}\t{value_10:.2f}")
+    
+    _write_lines(lines)
 
 def demo_kalman_filter():
     """演示卡尔曼滤波器"""
@@ -72,10 +94,13 @@ def demo_kalman_filter():
     print("时间戳\t\t原始值\t卡尔曼值\t置信度")
     print("-" * 60)
     
-    for timestamp, value in test_data:
+    lines = []
+    time_strs = _format_times([timestamp for timestamp, _ in test_data])
+    for time_str, (_, value) in zip(time_strs, test_data):
         result = kalman.process(value)
-        time_str = time.strftime('%H:%M:%S', time.localtime(timestamp))
-        print(f"{time_str}\t{value:.2f}\t{result.processed_value:.2f}\t\t{result.confidence:.3f}")
+        lines.append(f"{time_str}\t{value:.2f}\t{result.processed_value:.2f}\t\t{result.confidence:.3f}")
+    
+    _write_lines(lines)
 
 def demo_outlier_detection():
     """演示异常值检测"""
@@ -89,14 +114,17 @@ def demo_outlier_detection():
     print("时间戳\t\t原始值\t处理值\t异常检测\tZ分数")
     print("-" * 70)
     
-    for timestamp, value in test_data:
+    lines = []
+    time_strs = _format_times([timestamp for timestamp, _ in test_data])
+    for time_str, (_, value) in zip(time_strs, test_data):
         result = detector.process(value)
-        time_str = time.strftime('%H:%M:%S', time.localtime(timestamp))
         is_outlier = result.metadata.get('is_outlier', False)
         z_score = result.metadata.get('z_score', 0)
         outlier_str = "🔴异常" if is_outlier else "🟢正常"
         
-        print(f"{time_str}\t{value:.2f}\t{result.processed_value:.2f}\t{outlier_str}\t\t{z_score:.2f}")
+        lines.append(f"{time_str}\t{value:.2f}\t{result.processed_value:.2f}\t{outlier_str}\t\t{z_score:.2f}")
+    
+    _write_lines(lines)
 
 def demo_trend_analysis():
     """演示趋势分析"""
@@ -110,16 +138,19 @@ def demo_trend_analysis():
     print("时间戳\t\t数值\t趋势\t\t斜率\t\tR²")
     print("-" * 70)
     
-    for timestamp, value in test_data:
+    lines = []
+    time_strs = _format_times([timestamp for timestamp, _ in test_data])
+    for time_str, (timestamp, value) in zip(time_strs, test_data):
         result = analyzer.process(value, timestamp)
-        time_str = time.strftime('%H:%M:%S', time.localtime(timestamp))
         trend = result.metadata.get('trend', 'unknown')
         slope = result.metadata.get('slope', 0)
         r_squared = result.metadata.get('r_squared', 0)
         
         trend_icon = {"increasing": "📈", "decreasing": "📉", "stable": "➡️"}.get(trend, "❓")
         
-        print(f"{time_str}\t{value:.2f}\t{trend_icon}{trend}\t{slope:.4f}\t\t{r_squared:.3f}")
+        lines.append(f"{time_str}\t{value:.2f}\t{trend_icon}{trend}\t{slope:.4f}\t\t{r_squared:.3f}")
+    
+    _write_lines(lines)
 
 def demo_data_fusion():
     """演示数据融合"""
@@ -141,19 +172,20 @@ def demo_data_fusion():
     print("传感器A\t传感器B\t传感器C\t融合值\t置信度")
     print("-" * 60)
     
-    for i in range(10):
-        # 模拟三个传感器的读数
-        base_value = 25 + random.gauss(0, 0.5)
-        sensor_data = {
-            "sensor_a": base_value + random.gauss(0, 0.2),
-            "sensor_b": base_value + random.gauss(0, 0.3),
-            "sensor_c": base_value + random.gauss(0, 0.1)
-        }
-        
-        result = fusion.fuse_data(sensor_data)
-        
-        print(f"{sensor_data['sensor_a']:.2f}\t{sensor_data['sensor_b']:.2f}\t"
-              f"{sensor_data['sensor_c']:.2f}\t{result.processed_value:.2f}\t{result.confidence:.3f}")
+    # 模拟三个传感器的读数（共享基准值，各自叠加不同噪声）
+    rng = np.random.default_rng()
+    sensor_names = ["sensor_a", "sensor_b", "sensor_c"]
+    base_values = 25 + rng.normal(0, 0.5, (10, 1))
+    readings = (base_values + rng.normal(0, [0.2, 0.3, 0.1], (10, 3))).tolist()
+    
+    fused_values, confidence = fusion.fuse_data_many(sensor_names, readings)
+    
+    lines = [
+        f"{sensor_a:.2f}\t{sensor_b:.2f}\t{sensor_c:.2f}\t{fused_value:.2f}\t{confidence:.3f}"
+        for (sensor_a, sensor_b, sensor_c), fused_value in zip(readings, fused_values)
+    ]
+    
+    _write_lines(lines)
 
 def demo_adaptive_filter():
     """演示自适应滤波器"""
@@ -167,12 +199,15 @@ def demo_adaptive_filter():
     print("时间戳\t\t原始值\t滤波值\t学习率\t置信度")
     print("-" * 70)
     
-    for timestamp, value in test_data:
+    lines = []
+    time_strs = _format_times([timestamp for timestamp, _ in test_data])
+    for time_str, (_, value) in zip(time_strs, test_data):
         result = adaptive.process(value)
-        time_str = time.strftime('%H:%M:%S', time.localtime(timestamp))
         alpha = result.metadata.get('alpha', 0)
         
-        print(f"{time_str}\t{value:.2f}\t{result.processed_value:.2f}\t{alpha:.3f}\t\t{result.confidence:.3f}")
+        lines.append(f"{time_str}\t{value:.2f}\t{result.processed_value:.2f}\t{alpha:.3f}\t\t{result.confidence:.3f}")
+    
+    _write_lines(lines)
 
 def demo_algorithm_manager():
     """演示算法管理器"""
@@ -228,18 +263,21 @@ def demo_statistical_analysis():
     print("添加数据点后的统计信息:")
     print("-" * 60)
     
+    lines = []
     for i, (timestamp, value) in enumerate(test_data[:15]):
         stats = analyzer.process(value)
         
         if i % 5 == 4:  # 每5个数据点显示一次统计
-            print(f"\n第 {i+1} 个数据点后:")
-            print(f"  样本数: {stats['count']}")
-            print(f"  均值: {stats['mean']:.2f}")
-            print(f"  中位数: {stats['median']:.2f}")
-            print(f"  标准差: {stats['std_dev']:.3f}")
-            print(f"  最小值: {stats['min']:.2f}")
-            print(f"  最大值: {stats['max']:.2f}")
-            print(f"  范围: {stats['range']:.2f}")
+            lines.append(f"\n第 {i+1} 个数据点后:")
+            lines.append(f"  样本数: {stats['count']}")
+            lines.append(f"  均值: {stats['mean']:.2f}")
+            lines.append(f"  中位数: {stats['median']:.2f}")
+            lines.append(f"  标准差: {stats['std_dev']:.3f}")
+            lines.append(f"  最小值: {stats['min']:.2f}")
+            lines.append(f"  最大值: {stats['max']:.2f}")
+            lines.append(f"  范围: {stats['range']:.2f}")
+    
+    _write_lines(lines)
 
 def main():
     """主演示函数"""
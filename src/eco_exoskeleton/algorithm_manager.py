@@ -8,19 +8,87 @@
 import json
 import time
 import logging
-from typing import Dict, List, Optional, Any, Callable, Type
-from collections import defaultdict
-from dataclasses import dataclass, asdict
+import threading
+import importlib
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, Callable, Type, Deque, Tuple
+from collections import defaultdict, deque
+from dataclasses import dataclass, fields
 from eco_exoskeleton.sensor_collector import get_sensor_collector, SensorCollector
 from eco_exoskeleton.database_manager import get_database_manager
-from eco_exoskeleton.data_processing import (
-    ProcessingResult, MovingAverageFilter, KalmanFilter, 
-    OutlierDetector, TrendAnalyzer, StatisticalAnalyzer, 
-    DataFusionProcessor, AdaptiveFilter
-)
+from eco_exoskeleton.data_processing import ProcessingResult
 
 logger = logging.getLogger(__name__)
 
+# 每个算法在内存中缓存的最近结果数量
+RESULTS_CACHE_SIZE = 1000
+
+# 数值字段缓存最多记录的数据结构（模块 + 字段列表 + 值类型）数量
+NUMERIC_KEYS_CACHE_SIZE = 64
+
+# 内置算法类型 -> 实现类路径（"模块:类名"），首次使用时才导入
+BUILTIN_ALGORITHM_TYPES = {
+    'moving_average': 'eco_exoskeleton.data_processing:MovingAverageFilter',
+    'kalman_filter': 'eco_exoskeleton.data_processing:KalmanFilter',
+    'outlier_detector': 'eco_exoskeleton.data_processing:OutlierDetector',
+    'trend_analyzer': 'eco_exoskeleton.data_processing:TrendAnalyzer',
+    'statistical_analyzer': 'eco_exoskeleton.data_processing:StatisticalAnalyzer',
+    'data_fusion': 'eco_exoskeleton.data_processing:DataFusionProcessor',
+    'adaptive_filter': 'eco_exoskeleton.data_processing:AdaptiveFilter'
+}
+
+@lru_cache(maxsize=None)
+def _resolve_algorithm_class(class_path: str) -> Type:
+    """按 "模块:类名" 路径导入算法类（结果缓存）"""
+    module_name, class_name = class_path.split(':')
+    return getattr(importlib.import_module(module_name), class_name)
+
+def _make_dispatcher(algorithm: Any, algorithm_type: str) -> Optional[Callable[[float, Dict[str, Any]], ProcessingResult]]:
+    """按算法类型生成专用的处理函数，避免每次处理时判断算法类型"""
+    if not hasattr(algorithm, 'process'):
+        return None
+    
+    process = algorithm.process
+    
+    if algorithm_type == 'trend_analyzer':
+        return lambda value, kwargs: process(value, kwargs.get('timestamp'))
+    
+    if algorithm_type == 'statistical_analyzer':
+        # 统计分析器返回字典，需要包装成ProcessingResult
+        return lambda value, kwargs: ProcessingResult(
+            original_value=value,
+            processed_value=value,
+            confidence=1.0,
+            metadata=process(value)
+        )
+    
+    return lambda value, kwargs: process(value)
+
+def _apply_algorithms(bound_algorithms: List[tuple], value: float,
+                      kwargs: Dict[str, Any]) -> Dict[str, ProcessingResult]:
+    """对单个数值依次执行管道中已绑定的算法（管道最内层循环）
+    
+    bound_algorithms 为 AlgorithmManager._bind_pipeline 生成的
+    (名称, 配置, 处理函数, 锁, 结果缓存) 列表。
+    """
+    field_results = {}
+    
+    for algo_name, config, dispatch, lock, cache in bound_algorithms:
+        if not config.enabled:
+            continue
+        
+        try:
+            with lock:
+                result = dispatch(value, kwargs)
+                cache.append(result)
+        except Exception as e:
+            logger.error(f"处理数据时出错: {e}")
+            continue
+        
+        field_results[algo_name] = result
+    
+    return field_results
+
 @dataclass
 class AlgorithmConfig:
     """算法配置"""
@@ -38,14 +106,37 @@ class ProcessingPipeline:
     input_modules: List[str]
     enabled: bool = True
 
+_ALGORITHM_CONFIG_FIELDS = tuple(f.name for f in fields(AlgorithmConfig))
+_PIPELINE_FIELDS = tuple(f.name for f in fields(ProcessingPipeline))
+
+def _export_fields(obj: Any, field_names: tuple) -> Dict[str, Any]:
+    """浅层导出数据类字段
+
+    与 asdict 不同，不做递归深拷贝；容器字段只复制一层，
+    避免导出结果与运行中的配置共享同一对象。
+    """
+    exported = {}
+    for name in field_names:
+        value = getattr(obj, name)
+        if isinstance(value, (dict, list)):
+            value = value.copy()
+        exported[name] = value
+    return exported
+
 class AlgorithmManager:
     """算法管理器"""
     
     def __init__(self, enable_database: bool = True):
         self.algorithms: Dict[str, Any] = {}
         self.algorithm_configs: Dict[str, AlgorithmConfig] = {}
+        self.algorithm_locks: Dict[str, threading.Lock] = {}
+        self._dispatch: Dict[str, Optional[Callable[[float, Dict[str, Any]], ProcessingResult]]] = {}
         self.pipelines: Dict[str, ProcessingPipeline] = {}
-        self.results_cache: Dict[str, List[ProcessingResult]] = defaultdict(list)
+        self._pipeline_bindings: Dict[str, List[Tuple[str, AlgorithmConfig, Callable, threading.Lock, Deque[ProcessingResult]]]] = {}
+        self._numeric_keys_cache: Dict[Tuple[str, Tuple[str, ...], Tuple[type, ...]], Tuple[str, ...]] = {}
+        self.results_cache: Dict[str, Deque[ProcessingResult]] = defaultdict(
+            lambda: deque(maxlen=RESULTS_CACHE_SIZE)
+        )
         self.sensor_collector: Optional[SensorCollector] = None
         self.running: bool = False
         self.enable_database: bool = enable_database
@@ -63,16 +154,8 @@ class AlgorithmManager:
     
     def _register_builtin_algorithms(self):
         """注册内置算法"""
-        # 注册算法类型映射
-        self.algorithm_types = {
-            'moving_average': MovingAverageFilter,
-            'kalman_filter': KalmanFilter,
-            'outlier_detector': OutlierDetector,
-            'trend_analyzer': TrendAnalyzer,
-            'statistical_analyzer': StatisticalAnalyzer,
-            'data_fusion': DataFusionProcessor,
-            'adaptive_filter': AdaptiveFilter
-        }
+        # 注册算法类型映射（类在首次创建该类型算法时才解析）
+        self.algorithm_types: Dict[str, str] = dict(BUILTIN_ALGORITHM_TYPES)
         
         # 创建默认算法配置
         default_configs = [
@@ -95,11 +178,14 @@ class AlgorithmManager:
                 return False
             
             # 创建算法实例
-            algorithm_class = self.algorithm_types[config.algorithm_type]
+            algorithm_class = _resolve_algorithm_class(self.algorithm_types[config.algorithm_type])
             algorithm_instance = algorithm_class(**config.parameters)
             
             self.algorithms[config.name] = algorithm_instance
             self.algorithm_configs[config.name] = config
+            self.algorithm_locks[config.name] = threading.Lock()
+            self._dispatch[config.name] = _make_dispatcher(algorithm_instance, config.algorithm_type)
+            self._pipeline_bindings.clear()
             
             logger.info(f"添加算法配置: {config.name}")
             return True
@@ -113,6 +199,9 @@ class AlgorithmManager:
         if name in self.algorithms:
             del self.algorithms[name]
             del self.algorithm_configs[name]
+            del self.algorithm_locks[name]
+            del self._dispatch[name]
+            self._pipeline_bindings.clear()
             logger.info(f"移除算法配置: {name}")
             return True
         return False
@@ -126,6 +215,7 @@ class AlgorithmManager:
                 return False
         
         self.pipelines[pipeline.name] = pipeline
+        self._pipeline_bindings.pop(pipeline.name, None)
         logger.info(f"创建处理管道: {pipeline.name}")
         return True
     
@@ -133,12 +223,16 @@ class AlgorithmManager:
         """移除数据处理管道"""
         if name in self.pipelines:
             del self.pipelines[name]
+            self._pipeline_bindings.pop(name, None)
             logger.info(f"移除处理管道: {name}")
             return True
         return False
     
-    def process_data(self, algorithm_name: str, value: float, **kwargs) -> Optional[ProcessingResult]:
-        """使用指定算法处理数据"""
+    def process_data(self, algorithm_name: str, value: float, store_db: bool = True, **kwargs) -> Optional[ProcessingResult]:
+        """使用指定算法处理数据
+        
+        store_db 为 False 时不单独写数据库，由调用方（如处理管道）统一存储。
+        """
         if algorithm_name not in self.algorithms:
             logger.error(f"算法 {algorithm_name} 不存在")
             return None
@@ -149,31 +243,18 @@ class AlgorithmManager:
             return None
         
         try:
-            algorithm = self.algorithms[algorithm_name]
-            
-            # 根据算法类型调用不同的处理方法
-            if hasattr(algorithm, 'process'):
-                if config.algorithm_type == 'trend_analyzer':
-                    result = algorithm.process(value, kwargs.get('timestamp'))
-                elif config.algorithm_type == 'statistical_analyzer':
-                    # 统计分析器返回字典，需要包装成ProcessingResult
-                    stats = algorithm.process(value)
-                    result = ProcessingResult(
-                        original_value=value,
-                        processed_value=value,
-                        confidence=1.0,
-                        metadata=stats
-                    )
-                else:
-                    result = algorithm.process(value)
-                
-                # 缓存结果
-                self.results_cache[algorithm_name].append(result)
-                if len(self.results_cache[algorithm_name]) > 1000:
-                    self.results_cache[algorithm_name].pop(0)
+            # 使用添加配置时按算法类型生成的专用处理函数
+            dispatch = self._dispatch[algorithm_name]
+            if dispatch is not None:
+                # 传感器回调线程与其他线程（CLI、演示脚本）可能同时调用同一算法实例，需串行化其状态更新
+                with self.algorithm_locks[algorithm_name]:
+                    result = dispatch(value, kwargs)
+                    
+                    # 缓存结果
+                    self.results_cache[algorithm_name].append(result)
                 
                 # 存储到数据库（如果启用）
-                if self.db_manager:
+                if store_db and self.db_manager:
                     try:
                         timestamp = kwargs.get('timestamp', time.time())
                         self.db_manager.store_algorithm_result(
@@ -213,39 +294,78 @@ class AlgorithmManager:
         if pipeline.input_modules and module not in pipeline.input_modules:
             return {}
         
+        numeric_keys = self._get_numeric_keys(module, data)
+        if not numeric_keys:
+            return {}
+        
+        bound_algorithms = self._bind_pipeline(pipeline)
         results = {}
+        db_rows = []
+        now = time.time()  # 同一帧的所有结果共用一个时间戳
+        kwargs = {'timestamp': now}
         
-        # 对每个数据字段应用管道中的算法
-        for key, value in data.items():
-            if isinstance(value, (int, float)):
-                field_results = {}
-                
-                for algo_name in pipeline.algorithms:
-                    result = self.process_data(algo_name, float(value), timestamp=time.time())
-                    if result:
-                        field_results[algo_name] = result
-                        
-                        # 存储到数据库（带模块和字段信息）
-                        if self.db_manager:
-                            try:
-                                self.db_manager.store_algorithm_result(
-                                    timestamp=time.time(),
-                                    algorithm_name=algo_name,
-                                    module=module,
-                                    data_field=key,
-                                    original_value=float(value),
-                                    processed_value=result.processed_value,
-                                    confidence=result.confidence,
-                                    metadata=result.metadata or {}
-                                )
-                            except Exception as e:
-                                logger.error(f"存储管道算法结果到数据库失败: {e}")
-                
-                if field_results:
-                    results[key] = field_results
+        # 对每个数值字段应用管道中的算法
+        for key in numeric_keys:
+            value = float(data[key])
+            field_results = _apply_algorithms(bound_algorithms, value, kwargs)
+            if field_results:
+                results[key] = field_results
+                db_rows.extend(
+                    (now, algo_name, module, key, value,
+                     result.processed_value, result.confidence, result.metadata or {})
+                    for algo_name, result in field_results.items()
+                )
+        
+        # 交给数据库写入线程批量存储（带模块和字段信息），不阻塞传感器回调线程
+        if self.db_manager and db_rows:
+            self.db_manager.store_algorithm_results_batch(db_rows)
         
         return results
     
+    def flush(self):
+        """等待尚未入库的算法结果全部写入数据库"""
+        if self.db_manager:
+            self.db_manager.flush()
+    
+    def _bind_pipeline(self, pipeline: ProcessingPipeline) -> List[Tuple[str, AlgorithmConfig, Callable, threading.Lock, Deque[ProcessingResult]]]:
+        """预先解析管道中各算法的 (名称, 配置, 处理函数, 锁, 结果缓存)
+        
+        结果按管道缓存，算法配置或管道变化时失效，
+        使管道热路径无需每个样本重复查找多个字典。
+        """
+        bound = self._pipeline_bindings.get(pipeline.name)
+        if bound is None:
+            bound = []
+            for algo_name in pipeline.algorithms:
+                if algo_name not in self.algorithms:
+                    logger.error(f"算法 {algo_name} 不存在")
+                    continue
+                dispatch = self._dispatch[algo_name]
+                if dispatch is None:
+                    logger.error(f"算法 {algo_name} 没有process方法")
+                    continue
+                bound.append((
+                    algo_name, self.algorithm_configs[algo_name], dispatch,
+                    self.algorithm_locks[algo_name], self.results_cache[algo_name]
+                ))
+            self._pipeline_bindings[pipeline.name] = bound
+        return bound
+    
+    def _get_numeric_keys(self, module: str, data: Dict[str, Any]) -> Tuple[str, ...]:
+        """获取数据中的数值字段名
+        
+        按 (模块, 字段列表, 各字段值类型) 缓存，同一数据结构只做一次类型检查；
+        字段列表或某个字段的类型变化时（例如某帧为 None 或数值字符串）生成新的缓存项。
+        """
+        schema = (module, tuple(data), tuple(map(type, data.values())))
+        numeric_keys = self._numeric_keys_cache.get(schema)
+        if numeric_keys is None:
+            numeric_keys = tuple(key for key, value in data.items() if isinstance(value, (int, float)))
+            if len(self._numeric_keys_cache) >= NUMERIC_KEYS_CACHE_SIZE:
+                self._numeric_keys_cache.clear()
+            self._numeric_keys_cache[schema] = numeric_keys
+        return numeric_keys
+    
     def connect_to_sensor_collector(self) -> bool:
         """连接到传感器收集器"""
         try:
@@ -267,12 +387,14 @@ class AlgorithmManager:
     def _on_sensor_data(self, module: str, data: Dict[str, Any]):
         """传感器数据回调"""
         try:
-            # 对所有启用的管道执行处理
-            for pipeline_name, pipeline in self.pipelines.items():
-                if pipeline.enabled:
-                    results = self.process_pipeline(pipeline_name, module, data)
-                    if results:
-                        logger.debug(f"管道 {pipeline_name} 处理 {module} 数据: {len(results)} 个字段")
+            # 按顺序执行所有启用的管道：多个管道共享有状态的算法实例，
+            # 顺序执行保证各实例看到的样本顺序固定
+            for pipeline_name, pipeline in list(self.pipelines.items()):
+                if not pipeline.enabled:
+                    continue
+                results = self.process_pipeline(pipeline_name, module, data)
+                if results:
+                    logger.debug(f"管道 {pipeline_name} 处理 {module} 数据: {len(results)} 个字段")
                         
         except Exception as e:
             logger.error(f"处理传感器数据回调时出错: {e}")
@@ -280,7 +402,7 @@ class AlgorithmManager:
     def get_algorithm_results(self, algorithm_name: str, count: int = 10) -> List[ProcessingResult]:
         """获取算法处理结果"""
         if algorithm_name in self.results_cache:
-            return self.results_cache[algorithm_name][-count:]
+            return list(self.results_cache[algorithm_name])[-count:]
         return []
     
     def get_algorithm_status(self) -> Dict[str, Any]:
@@ -316,8 +438,8 @@ class AlgorithmManager:
     def export_config(self) -> Dict[str, Any]:
         """导出配置"""
         return {
-            'algorithms': [asdict(config) for config in self.algorithm_configs.values()],
-            'pipelines': [asdict(pipeline) for pipeline in self.pipelines.values()]
+            'algorithms': [_export_fields(config, _ALGORITHM_CONFIG_FIELDS) for config in self.algorithm_configs.values()],
+            'pipelines': [_export_fields(pipeline, _PIPELINE_FIELDS) for pipeline in self.pipelines.values()]
         }
     
     def import_config(self, config_data: Dict[str, Any]) -> bool:
@@ -326,6 +448,9 @@ class AlgorithmManager:
             # 清除现有配置
             self.algorithms.clear()
             self.algorithm_configs.clear()
+            self.algorithm_locks.clear()
+            self._dispatch.clear()
+            self._pipeline_bindings.clear()
             self.pipelines.clear()
             
             # 导入算法配置
@@ -372,6 +497,9 @@ class AlgorithmManager:
         if self.sensor_collector:
             self.sensor_collector.remove_data_callback(self._on_sensor_data)
         
+        # 写完尚未入库的管道结果
+        self.flush()
+        
         logger.info("算法管理器已停止")
 
 # 全局算法管理器实例
@@ -1,354 +1,622 @@
+import os
+import sys
 import time
-from eco_exoskeleton.system_controller import EcologicalExoskeletonSystem
-from eco_exoskeleton.models import ModuleState
+import queue
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import termios
+    import tty
+    msvcrt = None
+except ImportError:  # Windows
+    import msvcrt
+
+try:
+    import readline
+except ImportError:
+    readline = None
+
+from eco_exoskeleton.config import MODULES as _MODULES
+from eco_exoskeleton.database_manager import get_database_manager
+
+if TYPE_CHECKING:
+    from eco_exoskeleton.system_controller import EcologicalExoskeletonSystem
+
+_SEP = "=" * 60
+_SEP_SHORT = "=" * 50
+_RULE = "-" * 60
+
+_TS_FMT = "%Y-%m-%d %H:%M:%S"
+
+# 置信度分档（从高到低，严格大于阈值），低于所有阈值时为 🔴
+_CONF_BUCKETS = ((0.8, "🟢"), (0.5, "🟡"))
+
+
+def _conf_icon(confidence: float) -> str:
+    """按置信度返回状态图标"""
+    for threshold, icon in _CONF_BUCKETS:
+        if confidence > threshold:
+            return icon
+    return "🔴"
+
+
+_STATS_HEADERS = {
+    "sensor": "📊 传感器数据统计:",
+    "algorithm": "🧠 算法处理统计:",
+    "summary": "📝 总体统计:",
+}
+
+# 命令循环轮询间隔（秒），保证 Ctrl-C 能及时响应
+_POLL_INTERVAL = 0.5
+
+# 命令历史文件
+_HISTORY_FILE = os.path.expanduser("~/.eco_exo_cli_history")
+_HISTORY_LENGTH = 1000
+
+# 状态/数据库查询结果缓存时间（秒）
+_STATUS_CACHE_TTL = 1.0
+_DB_CACHE_TTL = 5.0
+
+_HELP_TEXT = "\n".join([
+    "",
+    _SEP,
+    "📖 命令帮助",
+    _SEP,
+    "基础命令:",
+    "  start          - 启动系统",
+    "  stop           - 停止系统",
+    "  status         - 显示系统状态",
+    "  emergency      - 紧急停止",
+    "  exit/quit      - 退出程序",
+    "",
+    "数据处理命令:",
+    "  algorithms     - 显示算法状态",
+    "  sensor_data    - 显示传感器数据",
+    "  processed_data - 显示处理后的数据",
+    "  pipelines      - 显示数据处理管道",
+    "",
+    "数据库命令:",
+    "  database       - 显示数据库信息",
+    "  db_stats       - 显示数据库统计",
+    "  db_cleanup     - 清理数据库",
+    "  help           - 显示此帮助信息",
+    _SEP,
+    "",
+])
+_HELP_BYTES = _HELP_TEXT.encode("utf-8")
+
+_BANNER_TEXT = "\n".join([
+    "生态修复外骨骼系统控制台 (增强版)",
+    _SEP_SHORT,
+    "基础命令: start, stop, status, emergency, exit",
+    "数据处理: algorithms, sensor_data, processed_data, pipelines",
+    _SEP_SHORT,
+    "",
+])
+_BANNER_BYTES = _BANNER_TEXT.encode("utf-8")
+
+_STATUS_TMPL = """系统运行状态: {system_icon}
+MQTT连接状态: {mqtt_icon}
+
+📊 传感器收集器:
+  连接状态: {sensor_icon}
+  总数据条数: {total_entries}
+  缓冲区大小: {buffer_size}
+
+🧠 算法管理器:
+  总算法数: {total_algorithms}
+  启用算法数: {enabled_algorithms}
+  总管道数: {total_pipelines}
+  启用管道数: {enabled_pipelines}
+
+🎯 决策系统:
+  修复计划长度: {repair_plan_length}"""
+
+_DB_INFO_TMPL = """数据库路径: {database_path}
+文件大小: {file_size_mb:.2f} MB
+
+表记录数:
+  传感器数据: {sensor_data_count:,}
+  算法结果: {algorithm_results_count:,}
+  系统状态: {system_status_count:,}
+"""
 
 class SystemCLI:
-    def __init__(self, system: EcologicalExoskeletonSystem):
+    def __init__(self, system: "EcologicalExoskeletonSystem"):
         self.system = system
         self.running = False
+        
+        # 命令分发表（exit/quit 为同一命令的别名）
+        self._handlers = {
+            "start": self._cmd_start,
+            "stop": self._cmd_stop,
+            "status": self._show_system_status,
+            "emergency": self._cmd_emergency,
+            "algorithms": self._show_algorithm_status,
+            "sensor_data": self._show_sensor_data,
+            "processed_data": self._show_processed_data,
+            "pipelines": self._show_pipelines,
+            "exit": self._cmd_exit,
+            "quit": self._cmd_exit,
+            "help": self._show_help,
+            "database": self._show_database_info,
+            "db_stats": self._show_database_stats,
+            "db_cleanup": self._handle_database_cleanup,
+        }
+        
+        # readline 补全候选
+        self._commands = sorted(self._handlers)
+        self._completions: List[str] = []
+        
+        # 输入线程读到的命令行（仅 _run_threaded_loop 使用）
+        self._lines = queue.Queue()
+        
+        # 查询结果短期缓存: key -> (时间, 结果)
+        self._cache: Dict[str, Tuple[float, Any]] = {}
+        
+        # 各模块字段的格式说明缓存: module -> {key: format_spec}
+        self._fmt_cache: Dict[str, Dict[str, str]] = {}
     
     def start(self):
         self.running = True
-        print("生态修复外骨骼系统控制台 (增强版)")
-        print("=" * 50)
-        print("基础命令: start, stop, status, emergency, exit")
-        print("数据处理: algorithms, sensor_data, processed_data, pipelines")
-        print("=" * 50)
+        self._write_static(_BANNER_TEXT, _BANNER_BYTES)
+        
+        # 终端且有 readline 时在主线程用 input()（行编辑、历史、补全）；
+        # 其他情况（Windows、管道输入）使用独立的输入线程
+        if readline is not None and sys.stdin.isatty():
+            self._run_readline_loop()
+        else:
+            self._run_threaded_loop()
+    
+    def _dispatch(self, line: str):
+        """分发一行命令（空行直接忽略）"""
+        if not line or line.isspace():
+            return
+        cmd = line.strip().lower()
+        handler = self._handlers.get(cmd)
+        if handler is None:
+            print("❓ 未知命令，输入 'help' 查看帮助")
+        else:
+            handler()
+    
+    def _interrupt(self):
+        """Ctrl-C 时安全关闭"""
+        self.running = False
+        self.system.stop()
+        print("\n🛑 系统已安全关闭")
+    
+    def _complete(self, text: str, state: int) -> Optional[str]:
+        """readline 命令补全"""
+        if state == 0:
+            self._completions = [cmd for cmd in self._commands if cmd.startswith(text)]
+        return self._completions[state] if state < len(self._completions) else None
+    
+    def _run_readline_loop(self):
+        """基于 readline 的命令循环（支持历史记录和 Tab 补全）
+        
+        readline 必须在主线程中通过 input() 使用。
+        """
+        readline.set_completer(self._complete)
+        readline.parse_and_bind("tab: complete")
+        readline.set_history_length(_HISTORY_LENGTH)
+        try:
+            readline.read_history_file(_HISTORY_FILE)
+        except OSError:
+            pass
+        
+        try:
+            while self.running:
+                try:
+                    try:
+                        line = input("> ")
+                    except EOFError:
+                        self._cmd_exit()
+                        break
+                    self._dispatch(line)
+                    
+                except KeyboardInterrupt:
+                    self._interrupt()
+        finally:
+            try:
+                readline.write_history_file(_HISTORY_FILE)
+            except OSError:
+                pass
+    
+    def _run_threaded_loop(self):
+        """基于输入线程的命令循环（Windows / 非终端输入）"""
+        line_done = threading.Event()
+        
+        def read_lines():
+            while self.running:
+                try:
+                    line = input("> ")
+                except (EOFError, OSError):
+                    # 输入结束或终端/管道已关闭，按退出处理
+                    line = None
+                self._lines.put(line)
+                if line is None:
+                    return
+                # 等待命令执行完毕再读下一行，避免与处理函数内的 input() 抢占 stdin
+                line_done.wait()
+                line_done.clear()
+        
+        reader = threading.Thread(target=read_lines, name="cli-input", daemon=True)
+        reader.start()
         
         while self.running:
             try:
-                cmd = input("> ").strip().lower()
+                try:
+                    line = self._lines.get(timeout=_POLL_INTERVAL)
+                except queue.Empty:
+                    continue
                 
-                if cmd == "start":
-                    if self.system.start():
-                        print("✅ 系统启动成功")
+                try:
+                    if line is None:
+                        self._cmd_exit()
                     else:
-                        print("❌ 系统启动失败")
-                
-                elif cmd == "stop":
-                    self.system.stop()
-                    print("✅ 系统已停止")
-                
-                elif cmd == "status":
-                    self._show_system_status()
-                
-                elif cmd == "emergency":
-                    self.system.emergency_stop()
-                    print("🚨 紧急停止已执行")
-                
-                elif cmd == "algorithms":
-                    self._show_algorithm_status()
-                
-                elif cmd == "sensor_data":
-                    self._show_sensor_data()
-                
-                elif cmd == "processed_data":
-                    self._show_processed_data()
-                
-                elif cmd == "pipelines":
-                    self._show_pipelines()
-                
-                elif cmd in ["exit", "quit"]:
-                    self.running = False
-                    self.system.stop()
-                    print("👋 退出系统")
-                
-                elif cmd == "help":
-                    self._show_help()
-                
-                elif cmd == "database":
-                    self._show_database_info()
-                
-                elif cmd == "db_stats":
-                    self._show_database_stats()
-                
-                elif cmd == "db_cleanup":
-                    self._handle_database_cleanup()
-                
-                else:
-                    print("❓ 未知命令，输入 'help' 查看帮助")
+                        self._dispatch(line)
+                finally:
+                    line_done.set()
                     
             except KeyboardInterrupt:
-                self.running = False
-                self.system.stop()
-                print("\n🛑 系统已安全关闭")
+                self._interrupt()
+                line_done.set()
+    
+    def _cmd_start(self):
+        """启动系统"""
+        started = self.system.start()
+        # 系统状态已改变，缓存的查询结果作废
+        self._cache.clear()
+        if started:
+            print("✅ 系统启动成功")
+        else:
+            print("❌ 系统启动失败")
+    
+    def _cmd_stop(self):
+        """停止系统"""
+        self.system.stop()
+        get_database_manager().flush()
+        # 在 flush 之后清空，数据库统计也要包含刚写入的数据
+        self._cache.clear()
+        print("✅ 系统已停止")
+    
+    def _cmd_emergency(self):
+        """紧急停止"""
+        self.system.emergency_stop()
+        get_database_manager().flush()
+        self._cache.clear()
+        print("🚨 紧急停止已执行")
+    
+    def _cmd_exit(self):
+        """退出控制台"""
+        self.running = False
+        self.system.stop()
+        get_database_manager().flush()
+        self._cache.clear()
+        print("👋 退出系统")
+    
+    def _cached(self, key: str, ttl: float, fn: Callable[[], Any]) -> Any:
+        """在 ttl 秒内复用同一查询的结果，避免连续命令重复查询"""
+        now = time.monotonic()
+        entry = self._cache.get(key)
+        if entry is not None and now - entry[0] < ttl:
+            return entry[1]
+        result = fn()
+        self._cache[key] = (now, result)
+        return result
+    
+    def _cached_iter(self, key: str, ttl: float, fn: Callable[[], Iterable[Any]]) -> Iterator[Any]:
+        """流式版本的 _cached：边产出边记录，完整迭代后才写入缓存"""
+        now = time.monotonic()
+        entry = self._cache.get(key)
+        if entry is not None and now - entry[0] < ttl:
+            yield from entry[1]
+            return
+        items = []
+        for item in fn():
+            items.append(item)
+            yield item
+        self._cache[key] = (now, items)
+    
+    def _fmt(self, module: str, key: str, value: Any) -> str:
+        """按缓存的格式说明格式化字段值（数值保留两位小数）"""
+        specs = self._fmt_cache.setdefault(module, {})
+        spec = specs.get(key)
+        if spec is None:
+            spec = specs[key] = ".2f" if isinstance(value, (int, float)) else ""
+        try:
+            return format(value, spec)
+        except (TypeError, ValueError):
+            # 字段类型发生变化时重新判定
+            del specs[key]
+            return self._fmt(module, key, value)
+    
+    def _write_static(self, text: str, data: bytes):
+        """直接向文件描述符写入预编码的静态文本
+        
+        仅在 POSIX 且 sys.stdout 未被替换时绕过 TextIOWrapper；
+        否则（测试重定向、Windows 控制台编码等）按普通文本写出。
+        """
+        stdout = sys.stdout
+        if os.name == "posix" and stdout is not None and stdout is sys.__stdout__:
+            stdout.flush()
+            fd = stdout.fileno()
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+        else:
+            stdout.write(text)
+            stdout.flush()
+    
+    def _write(self, lines):
+        """一次性输出整块文本，避免逐行 print"""
+        sys.stdout.write("\n".join(lines))
+        sys.stdout.write("\n")
+        sys.stdout.flush()
     
     def _show_system_status(self):
         """显示系统状态"""
-        print("\n" + "=" * 60)
-        print("🖥️  系统状态")
-        print("=" * 60)
+        out = ["", _SEP, "🖥️  系统状态", _SEP]
         
         try:
-            status = self.system.get_system_status()
-            
-            # 基础系统状态
-            print(f"系统运行状态: {'🟢 运行中' if status['system_running'] else '🔴 已停止'}")
-            print(f"MQTT连接状态: {'🟢 已连接' if status['mqtt_connected'] else '🔴 未连接'}")
+            status = self._cached("status", _STATUS_CACHE_TTL, self.system.get_system_status)
             
-            # 传感器收集器状态
             sensor_status = status['sensor_collector']
-            print(f"\n📊 传感器收集器:")
-            print(f"  连接状态: {'🟢 已连接' if sensor_status['connected'] else '🔴 未连接'}")
-            print(f"  总数据条数: {sensor_status['total_entries']}")
-            print(f"  缓冲区大小: {sensor_status['buffer_size']}")
-            
-            # 算法管理器状态
             algo_status = status['algorithm_manager']
-            print(f"\n🧠 算法管理器:")
-            print(f"  总算法数: {algo_status['total_algorithms']}")
-            print(f"  启用算法数: {algo_status['enabled_algorithms']}")
-            print(f"  总管道数: {algo_status['total_pipelines']}")
-            print(f"  启用管道数: {algo_status['enabled_pipelines']}")
-            
-            # 决策系统状态
             decision_status = status['decision_system']
-            print(f"\n🎯 决策系统:")
-            print(f"  修复计划长度: {decision_status['repair_plan_length']}")
+            out.append(_STATUS_TMPL.format_map({
+                'system_icon': '🟢 运行中' if status['system_running'] else '🔴 已停止',
+                'mqtt_icon': '🟢 已连接' if status['mqtt_connected'] else '🔴 未连接',
+                'sensor_icon': '🟢 已连接' if sensor_status['connected'] else '🔴 未连接',
+                'total_entries': sensor_status['total_entries'],
+                'buffer_size': sensor_status['buffer_size'],
+                'total_algorithms': algo_status['total_algorithms'],
+                'enabled_algorithms': algo_status['enabled_algorithms'],
+                'total_pipelines': algo_status['total_pipelines'],
+                'enabled_pipelines': algo_status['enabled_pipelines'],
+                'repair_plan_length': decision_status['repair_plan_length'],
+            }))
             
             # 模块状态
-            print(f"\n🏭 模块状态:")
-            for module, state in decision_status['module_states'].items():
-                print(f"  {module.upper()}: {state}")
+            out.append(f"\n🏭 模块状态:")
+            module_states = decision_status['module_states']
+            if module_states:
+                out.append("\n".join(f"  {module.upper()}: {state}" for module, state in module_states.items()))
                 
         except Exception as e:
-            print(f"❌ 获取系统状态失败: {e}")
+            out.append(f"❌ 获取系统状态失败: {e}")
         
-        print("=" * 60)
+        out.append(_SEP)
+        self._write(out)
     
     def _show_algorithm_status(self):
         """显示算法状态"""
-        print("\n" + "=" * 60)
-        print("🧠 算法状态")
-        print("=" * 60)
+        out = ["", _SEP, "🧠 算法状态", _SEP]
         
         try:
             algo_manager = self.system.algorithm_manager
             status = algo_manager.get_algorithm_status()
             
-            print(f"总算法数: {status['total_algorithms']}")
-            print(f"启用算法数: {status['enabled_algorithms']}")
+            out.append(f"总算法数: {status['total_algorithms']}")
+            out.append(f"启用算法数: {status['enabled_algorithms']}")
             
-            print("\n算法详情:")
-            print("-" * 60)
-            for name, info in status['algorithms'].items():
-                enabled_icon = "🟢" if info['enabled'] else "🔴"
-                print(f"{enabled_icon} {name}")
-                print(f"    类型: {info['type']}")
-                print(f"    优先级: {info['priority']}")
-                print(f"    结果数量: {info['results_count']}")
-                print()
+            out.append("\n算法详情:")
+            out.append(_RULE)
+            if status['algorithms']:
+                out.append("\n".join(
+                    f"{'🟢' if info['enabled'] else '🔴'} {name}\n"
+                    f"    类型: {info['type']}\n"
+                    f"    优先级: {info['priority']}\n"
+                    f"    结果数量: {info['results_count']}\n"
+                    for name, info in status['algorithms'].items()
+                ))
                 
         except Exception as e:
-            print(f"❌ 获取算法状态失败: {e}")
+            out.append(f"❌ 获取算法状态失败: {e}")
         
-        print("=" * 60)
+        out.append(_SEP)
+        self._write(out)
     
     def _show_sensor_data(self):
         """显示传感器数据"""
-        print("\n" + "=" * 60)
-        print("📊 传感器数据")
-        print("=" * 60)
+        out = ["", _SEP, "📊 传感器数据", _SEP]
+        
+        strftime = time.strftime
+        localtime = time.localtime
         
         try:
             collector = self.system.sensor_collector
+            snapshot = collector.get_latest_data_bulk(_MODULES)
             
-            for module in ['greenhouse', 'injection', 'bubble']:
-                print(f"\n🏭 {module.upper()} 模块:")
-                latest_data = collector.get_latest_data(module)
+            for module, latest_data in snapshot.items():
+                out.append(f"\n🏭 {module.upper()} 模块:")
                 
                 if latest_data:
-                    print(f"  时间戳: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(latest_data['timestamp']))}")
-                    print(f"  数据:")
+                    out.append(f"  时间戳: {strftime(_TS_FMT, localtime(latest_data['timestamp']))}")
+                    out.append(f"  数据:")
                     for key, value in latest_data['data'].items():
-                        if isinstance(value, (int, float)):
-                            print(f"    {key}: {value:.2f}")
-                        else:
-                            print(f"    {key}: {value}")
+                        out.append(f"    {key}: {self._fmt(module, key, value)}")
                 else:
-                    print("  🔴 暂无数据")
+                    out.append("  🔴 暂无数据")
                 
         except Exception as e:
-            print(f"❌ 获取传感器数据失败: {e}")
+            out.append(f"❌ 获取传感器数据失败: {e}")
         
-        print("=" * 60)
+        out.append(_SEP)
+        self._write(out)
     
     def _show_processed_data(self):
         """显示处理后的数据"""
-        print("\n" + "=" * 60)
-        print("⚙️  处理后的数据")
-        print("=" * 60)
+        out = ["", _SEP, "⚙️  处理后的数据", _SEP]
+        
+        strftime = time.strftime
+        localtime = time.localtime
         
         try:
             summary = self.system.get_processed_data_summary()
             
             # 显示原始数据
-            print("📊 最新原始数据:")
+            out.append("📊 最新原始数据:")
             for module, data in summary.items():
                 if module != 'algorithm_results':
-                    print(f"\n🏭 {module.upper()}:")
-                    print(f"  时间戳: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(data['timestamp']))}")
+                    out.append(f"\n🏭 {module.upper()}:")
+                    out.append(f"  时间戳: {strftime(_TS_FMT, localtime(data['timestamp']))}")
                     for key, value in data['raw_data'].items():
-                        if isinstance(value, (int, float)):
-                            print(f"  {key}: {value:.2f}")
-                        else:
-                            print(f"  {key}: {value}")
+                        out.append(f"  {key}: {self._fmt(module, key, value)}")
             
             # 显示算法处理结果
-            print(f"\n🧠 算法处理结果:")
+            out.append(f"\n🧠 算法处理结果:")
             if 'algorithm_results' in summary:
-                for algo_name, result in summary['algorithm_results'].items():
-                    confidence_icon = "🟢" if result['confidence'] > 0.8 else "🟡" if result['confidence'] > 0.5 else "🔴"
-                    print(f"  {confidence_icon} {algo_name}:")
-                    print(f"    处理值: {result['processed_value']:.3f}")
-                    print(f"    置信度: {result['confidence']:.3f}")
-                    print(f"    算法: {result['algorithm']}")
+                algorithm_results = summary['algorithm_results']
+                if algorithm_results:
+                    out.append("\n".join(
+                        f"  {_conf_icon(result['confidence'])} {algo_name}:\n"
+                        f"    处理值: {result['processed_value']:.3f}\n"
+                        f"    置信度: {result['confidence']:.3f}\n"
+                        f"    算法: {result['algorithm']}"
+                        for algo_name, result in algorithm_results.items()
+                    ))
             else:
-                print("  🔴 暂无算法结果")
+                out.append("  🔴 暂无算法结果")
                 
         except Exception as e:
-            print(f"❌ 获取处理数据失败: {e}")
+            out.append(f"❌ 获取处理数据失败: {e}")
         
-        print("=" * 60)
+        out.append(_SEP)
+        self._write(out)
     
     def _show_pipelines(self):
         """显示数据处理管道"""
-        print("\n" + "=" * 60)
-        print("🔄 数据处理管道")
-        print("=" * 60)
+        out = ["", _SEP, "🔄 数据处理管道", _SEP]
         
         try:
             algo_manager = self.system.algorithm_manager
             
             if not algo_manager.pipelines:
-                print("🔴 暂无数据处理管道")
-                return
-            
-            for name, pipeline in algo_manager.pipelines.items():
-                enabled_icon = "🟢" if pipeline.enabled else "🔴"
-                print(f"{enabled_icon} {name}")
-                print(f"    输入模块: {', '.join(pipeline.input_modules) if pipeline.input_modules else '所有模块'}")
-                print(f"    算法链: {' → '.join(pipeline.algorithms)}")
-                print()
+                out.append("🔴 暂无数据处理管道")
+            else:
+                out.append("\n".join(
+                    f"{'🟢' if pipeline.enabled else '🔴'} {name}\n"
+                    f"    输入模块: {', '.join(pipeline.input_modules) if pipeline.input_modules else '所有模块'}\n"
+                    f"    算法链: {' → '.join(pipeline.algorithms)}\n"
+                    for name, pipeline in algo_manager.pipelines.items()
+                ))
                 
         except Exception as e:
-            print(f"❌ 获取管道信息失败: {e}")
+            out.append(f"❌ 获取管道信息失败: {e}")
         
-        print("=" * 60)
+        out.append(_SEP)
+        self._write(out)
     
     def _show_help(self):
         """显示帮助信息"""
-        print("\n" + "=" * 60)
-        print("📖 命令帮助")
-        print("=" * 60)
-        print("基础命令:")
-        print("  start          - 启动系统")
-        print("  stop           - 停止系统") 
-        print("  status         - 显示系统状态")
-        print("  emergency      - 紧急停止")
-        print("  exit/quit      - 退出程序")
-        print()
-        print("数据处理命令:")
-        print("  algorithms     - 显示算法状态")
-        print("  sensor_data    - 显示传感器数据")
-        print("  processed_data - 显示处理后的数据")
-        print("  pipelines      - 显示数据处理管道")
-        print()
-        print("数据库命令:")
-        print("  database       - 显示数据库信息")
-        print("  db_stats       - 显示数据库统计")
-        print("  db_cleanup     - 清理数据库")
-        print("  help           - 显示此帮助信息")
-        print("=" * 60)
-
+        self._write_static(_HELP_TEXT, _HELP_BYTES)
+    
     def _show_database_info(self):
         """显示数据库信息"""
-        print("\n" + "=" * 60)
-        print("💾 数据库信息")
-        print("=" * 60)
+        out = ["", _SEP, "💾 数据库信息", _SEP]
         
         try:
-            from eco_exoskeleton.database_manager import get_database_manager
             db_manager = get_database_manager()
-            info = db_manager.get_database_info()
+            info = self._cached("database_info", _DB_CACHE_TTL, db_manager.get_database_info)
             
-            print(f"数据库路径: {info.get('database_path', 'N/A')}")
-            print(f"文件大小: {info.get('file_size_mb', 0):.2f} MB")
-            print()
-            
-            print("表记录数:")
-            print(f"  传感器数据: {info.get('sensor_data_count', 0):,}")
-            print(f"  算法结果: {info.get('algorithm_results_count', 0):,}")
-            print(f"  系统状态: {info.get('system_status_count', 0):,}")
-            print()
+            out.append(_DB_INFO_TMPL.format_map({
+                'database_path': info.get('database_path', 'N/A'),
+                'file_size_mb': info.get('file_size_mb', 0),
+                'sensor_data_count': info.get('sensor_data_count', 0),
+                'algorithm_results_count': info.get('algorithm_results_count', 0),
+                'system_status_count': info.get('system_status_count', 0),
+            }))
             
             if 'data_time_range' in info:
                 time_range = info['data_time_range']
-                print(f"数据时间范围:")
-                print(f"  开始时间: {time_range['start']}")
-                print(f"  结束时间: {time_range['end']}")
+                out.append(f"数据时间范围:")
+                out.append(f"  开始时间: {time_range['start']}")
+                out.append(f"  结束时间: {time_range['end']}")
             
         except Exception as e:
-            print(f"❌ 获取数据库信息失败: {e}")
+            out.append(f"❌ 获取数据库信息失败: {e}")
         
-        print("=" * 60)
+        out.append(_SEP)
+        self._write(out)
     
     def _show_database_stats(self):
-        """显示数据库统计"""
-        print("\n" + "=" * 60)
-        print("📈 数据库统计信息 (最近24小时)")
-        print("=" * 60)
+        """显示数据库统计（查询结果逐块输出）"""
+        self._write(["", _SEP, "📈 数据库统计信息 (最近24小时)", _SEP])
         
         try:
-            from eco_exoskeleton.database_manager import get_database_manager
             db_manager = get_database_manager()
-            stats = db_manager.get_statistics(24)
+            blocks = self._cached_iter("db_stats", _DB_CACHE_TTL, lambda: db_manager.iter_statistics(24))
             
-            # 显示传感器数据统计
-            if 'sensor_data' in stats:
-                print("📊 传感器数据统计:")
-                for module, module_stats in stats['sensor_data'].items():
-                    print(f"  {module} 模块:")
-                    for data_type, type_stats in module_stats.items():
+            section = None
+            for kind, name, block in blocks:
+                out = []
+                if kind != section:
+                    if section is not None:
+                        out.append("")
+                    out.append(_STATS_HEADERS[kind])
+                    section = kind
+                
+                if kind == 'sensor':
+                    # 传感器数据统计
+                    out.append(f"  {name} 模块:")
+                    for data_type, type_stats in block.items():
                         if data_type != 'raw':
                             avg_val = type_stats.get('avg', 'N/A')
                             min_val = type_stats.get('min', 'N/A')
                             max_val = type_stats.get('max', 'N/A')
                             count = type_stats.get('count', 0)
-                            print(f"    {data_type}: {count} 条记录")
+                            out.append(f"    {data_type}: {count} 条记录")
                             if avg_val != 'N/A':
-                                print(f"      平均值: {avg_val}, 范围: [{min_val}, {max_val}]")
-                print()
-            
-            # 显示算法结果统计
-            if 'algorithm_results' in stats:
-                print("🧠 算法处理统计:")
-                for algo_name, algo_stats in stats['algorithm_results'].items():
-                    count = algo_stats.get('count', 0)
-                    confidence = algo_stats.get('avg_confidence', 'N/A')
-                    print(f"  {algo_name}: {count} 次处理")
+                                out.append(f"      平均值: {avg_val}, 范围: [{min_val}, {max_val}]")
+                
+                elif kind == 'algorithm':
+                    # 算法结果统计
+                    count = block.get('count', 0)
+                    confidence = block.get('avg_confidence', 'N/A')
+                    out.append(f"  {name}: {count} 次处理")
                     if confidence != 'N/A':
-                        print(f"    平均置信度: {confidence}")
-                print()
-            
-            # 显示总体统计
-            if 'summary' in stats:
-                summary = stats['summary']
-                print("📝 总体统计:")
-                print(f"  传感器记录数: {summary.get('total_sensor_records', 0):,}")
-                print(f"  算法记录数: {summary.get('total_algorithm_records', 0):,}")
-                print(f"  统计时间段: {summary.get('hours_back', 0)} 小时")
+                        out.append(f"    平均置信度: {confidence}")
+                
+                else:
+                    # 总体统计
+                    out.append(f"  传感器记录数: {block.get('total_sensor_records', 0):,}")
+                    out.append(f"  算法记录数: {block.get('total_algorithm_records', 0):,}")
+                    out.append(f"  统计时间段: {block.get('hours_back', 0)} 小时")
+                
+                self._write(out)
             
         except Exception as e:
-            print(f"❌ 获取数据库统计失败: {e}")
+            self._write([f"❌ 获取数据库统计失败: {e}"])
         
-        print("=" * 60)
+        self._write([_SEP])
+    
+    def _read_char(self, prompt: str) -> str:
+        """读取单个按键（无需回车）；非终端输入时退回到 input()"""
+        if not sys.stdin.isatty():
+            return input(prompt)
+        
+        sys.stdout.write(prompt)
+        sys.stdout.flush()
+        if msvcrt is not None:
+            char = msvcrt.getwch()
+        else:
+            fd = sys.stdin.fileno()
+            old_attrs = termios.tcgetattr(fd)
+            try:
+                tty.setcbreak(fd)
+                char = sys.stdin.read(1)
+            finally:
+                termios.tcsetattr(fd, termios.TCSADRAIN, old_attrs)
+        print(char)
+        return char
     
     def _handle_database_cleanup(self):
         """处理数据库清理"""
-        print("\n" + "=" * 60)
+        print("\n" + _SEP)
         print("🧹 数据库清理")
-        print("=" * 60)
+        print(_SEP)
         
         try:
             days_input = input("请输入要保留的天数 (默认30天): ").strip()
@@ -364,16 +632,16 @@ class SystemCLI:
                     print("❌ 请输入有效的数字")
                     return
             
-            confirm = input(f"确认删除 {days_to_keep} 天前的数据? (y/N): ").strip().lower()
+            confirm = self._read_char(f"确认删除 {days_to_keep} 天前的数据? (y/N): ").strip().lower()
             if confirm != 'y':
                 print("❌ 清理操作已取消")
                 return
             
-            from eco_exoskeleton.database_manager import get_database_manager
             db_manager = get_database_manager()
             
             print("🔄 正在清理数据库...")
             result = db_manager.cleanup_old_data(days_to_keep)
+            self._cache.clear()
             
             if result:
                 print("✅ 数据库清理完成:")
@@ -387,4 +655,4 @@ class SystemCLI:
         except Exception as e:
             print(f"❌ 数据库清理出错: {e}")
         
-        print("=" * 60)
+        print(_SEP)
@@ -6,20 +6,40 @@ MQTT_PORT = 1883
 MQTT_USER = os.getenv("MQTT_USER", "admin")
 MQTT_PASS = os.getenv("MQTT_PASS", "password")
 
+# MQTT topics per module: TOPICS[module][kind], kind in sensors/status/command
+MODULES = ("greenhouse", "injection", "bubble")
+
+
+def _module_topics(module):
+    return {
+        "sensors": f"exoskeleton/{module}/sensors",
+        "status": f"exoskeleton/{module}/status",
+        "command": f"exoskeleton/{module}/command",
+    }
+
+
+TOPICS = {module: _module_topics(module) for module in MODULES}
+
 # Greenhouse module topics
-TOPIC_GREENHOUSE_SENSORS = "exoskeleton/greenhouse/sensors"
-TOPIC_GREENHOUSE_STATUS = "exoskeleton/greenhouse/status"
-TOPIC_GREENHOUSE_COMMAND = "exoskeleton/greenhouse/command"
+TOPIC_GREENHOUSE_SENSORS = TOPICS["greenhouse"]["sensors"]
+TOPIC_GREENHOUSE_STATUS = TOPICS["greenhouse"]["status"]
+TOPIC_GREENHOUSE_COMMAND = TOPICS["greenhouse"]["command"]
 
 # Injection module topics
-TOPIC_INJECTION_SENSORS = "exoskeleton/injection/sensors"
-TOPIC_INJECTION_STATUS = "exoskeleton/injection/status"
-TOPIC_INJECTION_COMMAND = "exoskeleton/injection/command"
+TOPIC_INJECTION_SENSORS = TOPICS["injection"]["sensors"]
+TOPIC_INJECTION_STATUS = TOPICS["injection"]["status"]
+TOPIC_INJECTION_COMMAND = TOPICS["injection"]["command"]
 
 # Bubble machine module topics
-TOPIC_BUBBLE_SENSORS = "exoskeleton/bubble/sensors"
-TOPIC_BUBBLE_STATUS = "exoskeleton/bubble/status"
-TOPIC_BUBBLE_COMMAND = "exoskeleton/bubble/command"
+TOPIC_BUBBLE_SENSORS = TOPICS["bubble"]["sensors"]
+TOPIC_BUBBLE_STATUS = TOPICS["bubble"]["status"]
+TOPIC_BUBBLE_COMMAND = TOPICS["bubble"]["command"]
+
+# MQTT QoS: telemetry stays at 0 (QoS 1/2 costs roughly twice the CPU and latency
+# per message, and a lost sample is superseded by the next one); commands use 1
+# so they are delivered at least once
+SENSOR_QOS = 0
+COMMAND_QOS = 1
 
 # System parameters
 CONTROL_LOOP_FREQ = 10  # Hz
@@ -5,53 +5,219 @@
 数据融合、趋势分析等。提供可扩展的算法接口。
 """
 
+import heapq
 import math
-import statistics
-from typing import List, Dict, Optional, Tuple, Any
+import operator
+import time
+from typing import List, Dict, Optional, Tuple, Any, Iterable
 from collections import deque
 from dataclasses import dataclass
 import logging
 
+# numpy 为可选依赖：安装后各滤波器的 process_batch 按整段数组向量化计算
+try:
+    import numpy as np
+    from numpy.lib.stride_tricks import sliding_window_view
+except ImportError:
+    np = None
+
+# numba（依赖 numpy）为可选依赖：安装后批量卡尔曼滤波使用编译后的递推内核
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
 logger = logging.getLogger(__name__)
 
-@dataclass
+@dataclass(slots=True)
 class ProcessingResult:
-    """数据处理结果"""
+    """数据处理结果
+    
+    内容不随样本变化的 metadata 字典会在多个结果之间共享，只能读取，不要修改。
+    """
     original_value: float
     processed_value: float
     confidence: float
     metadata: Dict[str, Any]
 
+# 数据不足时各算法返回的固定 metadata（所有结果共享）
+_OUTLIER_INSUFFICIENT_METADATA = {
+    'algorithm': 'outlier_detection',
+    'is_outlier': False,
+    'reason': 'insufficient_data'
+}
+_TREND_UNKNOWN_METADATA = {
+    'algorithm': 'trend_analysis',
+    'trend': 'unknown',
+    'slope': 0,
+    'r_squared': 0
+}
+
+def _as_float_array(values: Iterable[float]) -> "np.ndarray":
+    """把任意数值序列转换为一维 float64 数组（已是数组时不复制）"""
+    if isinstance(values, np.ndarray):
+        return values.astype(np.float64, copy=False).ravel()
+    return np.fromiter(values, dtype=np.float64)
+
+def _window_sum(values: Iterable[float]) -> float:
+    """精确求和；窗口内同时出现 +inf 和 -inf 时 fsum 会报错，此时退回普通求和（结果为 nan）"""
+    try:
+        return math.fsum(values)
+    except (ValueError, OverflowError):
+        return sum(values)
+
+def _leading_partial(buffer: deque, window_size: int, count: int) -> int:
+    """批量输入的前多少个样本到达时窗口仍未填满（这部分逐个处理）"""
+    return max(0, min(count, window_size - 1 - len(buffer)))
+
 class MovingAverageFilter:
     """移动平均滤波器"""
     
     def __init__(self, window_size: int = 5):
         self.window_size = window_size
         self.data_buffer = deque(maxlen=window_size)
+        self._sum = 0.0  # 窗口内样本的累加和
+        self._evictions = 0
+        # 窗口填满后每个结果的 metadata 都相同，共享同一个字典
+        self._full_metadata = self._metadata(window_size)
+    
+    def _metadata(self, samples: int) -> Dict[str, Any]:
+        return {
+            'algorithm': 'moving_average',
+            'window_size': self.window_size,
+            'samples_used': samples
+        }
+    
+    def process_fast(self, value: float) -> float:
+        """处理单个数值，只返回滤波值（不构造 ProcessingResult）"""
+        if len(self.data_buffer) == self.window_size:
+            # 窗口已满，减去即将被挤出的最旧样本
+            self._sum -= self.data_buffer[0]
+            self._evictions += 1
+        self.data_buffer.append(value)
+        self._sum += value
+        
+        # 每滑过一整个窗口按窗口重新求和：inf 或极大的尖峰移出窗口后，
+        # 增量和里留下的 nan 或精度损失不会一直保留下去
+        if self._evictions >= self.window_size:
+            self._sum = _window_sum(self.data_buffer)
+            self._evictions = 0
+        
+        # 数据不足时按已有样本数求平均
+        return self._sum / len(self.data_buffer)
     
     def process(self, value: float) -> ProcessingResult:
         """处理单个数值"""
-        self.data_buffer.append(value)
+        processed = self.process_fast(value)
         
-        if len(self.data_buffer) < self.window_size:
-            # 数据不足时使用简单平均
-            processed = sum(self.data_buffer) / len(self.data_buffer)
-            confidence = len(self.data_buffer) / self.window_size
-        else:
-            # 使用完整窗口的移动平均
-            processed = sum(self.data_buffer) / self.window_size
-            confidence = 1.0
+        # 置信度随样本数增长
+        samples = len(self.data_buffer)
+        confidence = samples / self.window_size
         
         return ProcessingResult(
             original_value=value,
             processed_value=processed,
             confidence=confidence,
-            metadata={
-                'algorithm': 'moving_average',
-                'window_size': self.window_size,
-                'samples_used': len(self.data_buffer)
-            }
+            metadata=self._full_metadata if samples == self.window_size else self._metadata(samples)
         )
+    
+    def process_batch(self, values: Iterable[float]) -> List[float]:
+        """批量处理数值序列，仅返回滤波值（与 process 共享窗口状态）
+        
+        安装 numpy 时，窗口填满后的样本按滑动窗口视图一次算出各窗口均值。
+        不用前缀和：前缀和会把一个 inf 或极大的尖峰带进之后所有窗口。
+        """
+        if np is None:
+            return self._scan(values)
+        
+        values = _as_float_array(values)
+        leading = _leading_partial(self.data_buffer, self.window_size, len(values))
+        processed = self._scan(values[:leading].tolist())
+        values = values[leading:]
+        if not values.size:
+            return processed
+        
+        buffer = self.data_buffer
+        history = np.fromiter(buffer, dtype=np.float64, count=len(buffer))
+        samples = np.concatenate((history, values))
+        windows = sliding_window_view(samples, self.window_size)[len(history) - self.window_size + 1:]
+        # 同时含 +inf 和 -inf 的窗口均值为 nan，与逐个处理一致，不需要警告
+        with np.errstate(invalid='ignore'):
+            processed.extend(windows.mean(axis=1).tolist())
+        
+        buffer.extend(values[-self.window_size:].tolist())
+        self._sum = _window_sum(buffer)
+        self._evictions = 0
+        return processed
+    
+    def _scan(self, values: Iterable[float]) -> List[float]:
+        """process_batch 的纯 Python 实现"""
+        buffer = self.data_buffer
+        window_size = self.window_size
+        total = self._sum
+        evictions = self._evictions
+        processed = []
+        
+        for value in values:
+            if len(buffer) == window_size:
+                total -= buffer[0]
+                evictions += 1
+            buffer.append(value)
+            total += value
+            if evictions >= window_size:
+                total = _window_sum(buffer)
+                evictions = 0
+            processed.append(total / len(buffer))
+        
+        self._sum = total
+        self._evictions = evictions
+        return processed
+
+def _kalman_scan(measurements: Iterable[float], estimate: Optional[float], error: float,
+                 process_variance: float, measurement_variance: float
+                 ) -> Tuple[List[float], Optional[float], float]:
+    """卡尔曼滤波递推内核
+    
+    只使用局部标量变量，不访问实例属性。返回 (估计值序列, 最终估计值, 最终估计误差)。
+    """
+    processed = []
+    
+    for measurement in measurements:
+        if estimate is None:
+            estimate = measurement
+        else:
+            # 预测步骤
+            predicted_error = error + process_variance
+            
+            # 更新步骤
+            kalman_gain = predicted_error / (predicted_error + measurement_variance)
+            estimate = estimate + kalman_gain * (measurement - estimate)
+            error = (1 - kalman_gain) * predicted_error
+        processed.append(estimate)
+    
+    return processed, estimate, error
+
+if njit is not None:
+    @njit(cache=True)
+    def _kalman_scan_compiled(measurements, estimate, error, process_variance, measurement_variance):
+        """_kalman_scan 的 numba 版本：输入 float64 数组，估计值为 NaN 表示尚未初始化"""
+        count = measurements.shape[0]
+        processed = np.empty(count)
+        
+        for i in range(count):
+            measurement = measurements[i]
+            if math.isnan(estimate):
+                estimate = measurement
+            else:
+                predicted_error = error + process_variance
+                kalman_gain = predicted_error / (predicted_error + measurement_variance)
+                estimate = estimate + kalman_gain * (measurement - estimate)
+                error = (1 - kalman_gain) * predicted_error
+            processed[i] = estimate
+        
+        return processed, estimate, error
+else:
+    _kalman_scan_compiled = None
 
 class KalmanFilter:
     """简化的卡尔曼滤波器"""
@@ -62,21 +228,33 @@ class KalmanFilter:
         self.estimated_value = None
         self.estimation_error = 1.0
     
-    def process(self, measurement: float) -> ProcessingResult:
-        """处理传感器测量值"""
+    def _update(self, measurement: float) -> Optional[float]:
+        """用一个测量值更新估计，返回卡尔曼增益（首个测量值仅用于初始化，返回 None）"""
         if self.estimated_value is None:
             # 初始化
             self.estimated_value = measurement
+            return None
+        
+        # 预测步骤
+        predicted_error = self.estimation_error + self.process_variance
+        
+        # 更新步骤
+        kalman_gain = predicted_error / (predicted_error + self.measurement_variance)
+        self.estimated_value = self.estimated_value + kalman_gain * (measurement - self.estimated_value)
+        self.estimation_error = (1 - kalman_gain) * predicted_error
+        return kalman_gain
+    
+    def process_fast(self, measurement: float) -> float:
+        """处理传感器测量值，只返回估计值（不构造 ProcessingResult）"""
+        self._update(measurement)
+        return self.estimated_value
+    
+    def process(self, measurement: float) -> ProcessingResult:
+        """处理传感器测量值"""
+        kalman_gain = self._update(measurement)
+        if kalman_gain is None:
             confidence = 0.5
         else:
-            # 预测步骤
-            predicted_error = self.estimation_error + self.process_variance
-            
-            # 更新步骤
-            kalman_gain = predicted_error / (predicted_error + self.measurement_variance)
-            self.estimated_value = self.estimated_value + kalman_gain * (measurement - self.estimated_value)
-            self.estimation_error = (1 - kalman_gain) * predicted_error
-            
             # 计算置信度（基于误差减少量）
             confidence = 1.0 - min(self.estimation_error, 1.0)
         
@@ -86,10 +264,168 @@ class KalmanFilter:
             confidence=confidence,
             metadata={
                 'algorithm': 'kalman_filter',
-                'kalman_gain': kalman_gain if self.estimated_value != measurement else 0,
+                'kalman_gain': kalman_gain if kalman_gain is not None and self.estimated_value != measurement else 0,
                 'estimation_error': self.estimation_error
             }
         )
+    
+    def process_batch(self, measurements: Iterable[float]) -> List[float]:
+        """批量处理测量值序列，仅返回估计值（与 process 共享滤波状态）"""
+        if _kalman_scan_compiled is not None:
+            estimate = math.nan if self.estimated_value is None else self.estimated_value
+            processed, estimate, error = _kalman_scan_compiled(
+                _as_float_array(measurements), estimate, self.estimation_error,
+                self.process_variance, self.measurement_variance
+            )
+            self.estimated_value = None if math.isnan(estimate) else float(estimate)
+            self.estimation_error = float(error)
+            return processed.tolist()
+        
+        processed, self.estimated_value, self.estimation_error = _kalman_scan(
+            measurements, self.estimated_value, self.estimation_error,
+            self.process_variance, self.measurement_variance
+        )
+        return processed
+
+# 移除样本后 m2 缩小到移除前的这个比例以下，说明增量相减几乎完全相消，
+# 剩下的只是舍入残差（典型情况是窗口刚变为全部相同的数值），需按窗口精确重算
+_M2_CANCELLATION_RATIO = 1e-9
+
+class _RunningStats:
+    """滑动窗口的增量均值/方差（Welford 算法，支持移除旧样本）"""
+    
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # 与均值之差的平方和
+    
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+    
+    def remove(self, value: float) -> bool:
+        """移除一个样本；返回 True 表示发生严重相消，调用方应随后用 reset 按窗口精确重算"""
+        self.count -= 1
+        if self.count == 0:
+            self.mean = 0.0
+            self.m2 = 0.0
+            return False
+        previous_m2 = self.m2
+        delta = value - self.mean
+        self.mean -= delta / self.count
+        self.m2 = max(self.m2 - delta * (value - self.mean), 0.0)
+        return previous_m2 > 0.0 and self.m2 <= _M2_CANCELLATION_RATIO * previous_m2
+    
+    def reset(self, values: Iterable[float]):
+        """按给定样本精确重算，消除增量更新累积的浮点误差"""
+        values = list(values)
+        self.count = len(values)
+        if values and min(values) == max(values):
+            # 数值全部相同：fsum 后再除以个数仍可能偏离该数值，这里直接取精确结果
+            self.mean = float(values[0])
+            self.m2 = 0.0
+            return
+        self.mean = math.fsum(values) / self.count if values else 0.0
+        self.m2 = math.fsum((value - self.mean) ** 2 for value in values)
+    
+    @property
+    def constant(self) -> bool:
+        """窗口内数值是否全部相同
+
+        相同数值的增量更新不产生误差，而移除样本引起的相消会由调用方 reset 精确重算，
+        因此 m2 恰好为 0 就可以作为判断依据。
+        """
+        return self.m2 == 0.0
+    
+    @property
+    def variance(self) -> float:
+        """样本方差"""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+    
+    @property
+    def std_dev(self) -> float:
+        """样本标准差"""
+        return math.sqrt(self.variance)
+
+class _RollingMedian:
+    """滑动窗口中位数（双堆 + 延迟删除），增删均为 O(log W)
+
+    lo 为较小一半的大顶堆（存负值），hi 为较大一半的小顶堆，
+    保持 lo 比 hi 多 0 或 1 个有效元素。被移出窗口的值先记入 _delayed，
+    等它出现在堆顶时再真正弹出；堆中积压的已删除元素由 reset 清理。
+    """
+    
+    def __init__(self):
+        self._lo: List[float] = []
+        self._hi: List[float] = []
+        self._lo_size = 0  # 有效元素个数（不含待删除的）
+        self._hi_size = 0
+        self._delayed: Dict[float, int] = {}
+    
+    def _prune(self, heap: List[float], sign: int):
+        """弹出堆顶所有已标记删除的元素"""
+        delayed = self._delayed
+        while heap:
+            value = sign * heap[0]
+            pending = delayed.get(value)
+            if not pending:
+                break
+            if pending == 1:
+                del delayed[value]
+            else:
+                delayed[value] = pending - 1
+            heapq.heappop(heap)
+    
+    def _rebalance(self):
+        if self._lo_size > self._hi_size + 1:
+            heapq.heappush(self._hi, -heapq.heappop(self._lo))
+            self._lo_size -= 1
+            self._hi_size += 1
+            self._prune(self._lo, -1)
+        elif self._lo_size < self._hi_size:
+            heapq.heappush(self._lo, -heapq.heappop(self._hi))
+            self._hi_size -= 1
+            self._lo_size += 1
+            self._prune(self._hi, 1)
+    
+    def add(self, value: float):
+        if not self._lo_size or value <= -self._lo[0]:
+            heapq.heappush(self._lo, -value)
+            self._lo_size += 1
+        else:
+            heapq.heappush(self._hi, value)
+            self._hi_size += 1
+        self._rebalance()
+    
+    def remove(self, value: float):
+        self._delayed[value] = self._delayed.get(value, 0) + 1
+        if value <= -self._lo[0]:
+            self._lo_size -= 1
+            self._prune(self._lo, -1)
+        else:
+            self._hi_size -= 1
+            self._prune(self._hi, 1)
+        self._rebalance()
+    
+    def reset(self, values: Iterable[float]):
+        """按给定样本重建两个堆，同时丢弃积压的已删除元素"""
+        ordered = sorted(values)
+        split = (len(ordered) + 1) // 2
+        # 升序列表本身满足小顶堆性质，无需再 heapify
+        self._lo = [-value for value in reversed(ordered[:split])]
+        self._hi = ordered[split:]
+        self._lo_size = split
+        self._hi_size = len(ordered) - split
+        self._delayed.clear()
+    
+    @property
+    def median(self) -> float:
+        """当前窗口的中位数（与 statistics.median 结果一致），窗口为空时不可调用"""
+        if self._lo_size > self._hi_size:
+            return -self._lo[0]
+        return (-self._lo[0] + self._hi[0]) / 2
 
 class OutlierDetector:
     """异常值检测器"""
@@ -98,10 +434,37 @@ class OutlierDetector:
         self.window_size = window_size
         self.threshold_multiplier = threshold_multiplier
         self.data_buffer = deque(maxlen=window_size)
+        self._stats = _RunningStats()
+        self._median = _RollingMedian()
+        self._evictions = 0
+        # 窗口内数值全部相同（方差为 0）时的处理结果，同一数值重复到达时直接复用
+        self._quiescent_result: Optional[ProcessingResult] = None
+    
+    def _push(self, value: float):
+        """将新样本加入窗口，以 O(1) 更新均值与方差、O(log W) 更新中位数"""
+        cancelled = False
+        if len(self.data_buffer) == self.window_size:
+            oldest = self.data_buffer[0]
+            cancelled = self._stats.remove(oldest)
+            self._median.remove(oldest)
+            self._evictions += 1
+        self.data_buffer.append(value)
+        self._stats.add(value)
+        self._median.add(value)
+        
+        # 每滑过一整个窗口精确重算一次，代价均摊后仍为 O(1)；
+        # 顺便清理中位数堆中积压的已删除元素
+        if self._evictions >= self.window_size:
+            self._stats.reset(self.data_buffer)
+            self._median.reset(self.data_buffer)
+            self._evictions = 0
+        elif cancelled:
+            # 否则残差会让全同窗口的标准差略大于 0，Z 分数变成 残差/残差
+            self._stats.reset(self.data_buffer)
     
     def process(self, value: float) -> ProcessingResult:
         """检测异常值"""
-        self.data_buffer.append(value)
+        self._push(value)
         
         if len(self.data_buffer) < 3:
             # 数据不足，认为是正常值
@@ -109,30 +472,23 @@ class OutlierDetector:
                 original_value=value,
                 processed_value=value,
                 confidence=0.5,
-                metadata={
-                    'algorithm': 'outlier_detection',
-                    'is_outlier': False,
-                    'reason': 'insufficient_data'
-                }
+                metadata=_OUTLIER_INSUFFICIENT_METADATA
             )
         
-        # 计算统计信息
-        mean = statistics.mean(self.data_buffer)
-        std_dev = statistics.stdev(self.data_buffer) if len(self.data_buffer) > 1 else 0
+        # 传感器静止：窗口内全是同一数值，结果与上一次完全相同
+        quiescent = self._stats.constant
+        if quiescent:
+            cached = self._quiescent_result
+            if cached is not None and cached.original_value == value:
+                return cached
         
-        # 检测异常值（使用Z-score方法）
-        if std_dev > 0:
-            z_score = abs(value - mean) / std_dev
-            is_outlier = z_score > self.threshold_multiplier
-        else:
-            is_outlier = False
-            z_score = 0
+        mean, std_dev, z_score, is_outlier = self._score(value)
         
         # 如果是异常值，使用中位数替代
-        processed_value = value if not is_outlier else statistics.median(self.data_buffer)
+        processed_value = value if not is_outlier else self._median.median
         confidence = 1.0 - min(z_score / (self.threshold_multiplier * 2), 1.0)
         
-        return ProcessingResult(
+        result = ProcessingResult(
             original_value=value,
             processed_value=processed_value,
             confidence=confidence,
@@ -144,6 +500,75 @@ class OutlierDetector:
                 'std_dev': std_dev
             }
         )
+        if quiescent:
+            self._quiescent_result = result
+        return result
+    
+    def process_batch(self, values: Iterable[float]) -> List[float]:
+        """批量检测异常值，仅返回处理后的数值（与 process 共享窗口状态）
+        
+        安装 numpy 时，窗口填满后的样本按滑动窗口视图一次算出均值、标准差和 Z 分数，
+        中位数只对判定为异常的窗口计算。
+        """
+        if np is None or self.window_size < 3:
+            return self._scan(values)
+        
+        values = _as_float_array(values)
+        leading = _leading_partial(self.data_buffer, self.window_size, len(values))
+        processed = self._scan(values[:leading].tolist())
+        values = values[leading:]
+        if not values.size:
+            return processed
+        
+        buffer = self.data_buffer
+        history = np.fromiter(buffer, dtype=np.float64, count=len(buffer))
+        samples = np.concatenate((history, values))
+        windows = sliding_window_view(samples, self.window_size)[len(history) - self.window_size + 1:]
+        mean = windows.mean(axis=1)
+        std_dev = windows.std(axis=1, ddof=1)
+        deviation = np.abs(values - mean)
+        is_outlier = (std_dev > 0) & (deviation > self.threshold_multiplier * std_dev)
+        
+        result = values.copy()
+        outliers = np.flatnonzero(is_outlier)
+        if outliers.size:
+            result[outliers] = np.median(windows[outliers], axis=1)
+        
+        buffer.extend(values[-self.window_size:].tolist())
+        self._stats.reset(buffer)
+        self._median.reset(buffer)
+        self._evictions = 0
+        
+        processed.extend(result.tolist())
+        return processed
+    
+    def _scan(self, values: Iterable[float]) -> List[float]:
+        """process_batch 的纯 Python 实现"""
+        process_fast = self.process_fast
+        return [process_fast(value) for value in values]
+    
+    def process_fast(self, value: float) -> float:
+        """检测单个数值，只返回处理后的数值（不构造 ProcessingResult）"""
+        self._push(value)
+        if len(self.data_buffer) < 3:
+            return value
+        is_outlier = self._score(value)[3]
+        return self._median.median if is_outlier else value
+    
+    def _score(self, value: float) -> Tuple[float, float, float, bool]:
+        """基于当前窗口计算 (均值, 标准差, Z分数, 是否异常)"""
+        mean = self._stats.mean
+        std_dev = self._stats.std_dev
+        
+        # 检测异常值（使用Z-score方法）
+        if std_dev > 0:
+            z_score = abs(value - mean) / std_dev
+            is_outlier = z_score > self.threshold_multiplier
+        else:
+            is_outlier = False
+            z_score = 0
+        
+        return mean, std_dev, z_score, is_outlier
 
 class TrendAnalyzer:
     """趋势分析器"""
@@ -152,14 +577,56 @@ class TrendAnalyzer:
         self.window_size = window_size
         self.data_buffer = deque(maxlen=window_size)
         self.time_buffer = deque(maxlen=window_size)
+        
+        # 回归所需的累加量：x 为样本在窗口中的序号，y 取相对 _shift 的偏移以减小舍入误差
+        self._shift = 0.0
+        self._sum_y = 0.0
+        self._sum_yy = 0.0
+        self._sum_xy = 0.0
+        self._evictions = 0
+    
+    def _push(self, value: float):
+        """将新样本加入窗口，并以 O(1) 更新回归累加量"""
+        buffer = self.data_buffer
+        if not buffer:
+            self._shift = value
+        
+        if len(buffer) == self.window_size:
+            oldest = buffer[0] - self._shift
+            self._sum_y -= oldest
+            self._sum_yy -= oldest * oldest
+            # 移除最旧样本后，其余样本的序号各减 1
+            self._sum_xy -= self._sum_y
+            self._evictions += 1
+            x = self.window_size - 1
+        else:
+            x = len(buffer)
+        
+        buffer.append(value)
+        deviation = value - self._shift
+        self._sum_y += deviation
+        self._sum_yy += deviation * deviation
+        self._sum_xy += x * deviation
+        
+        # 每滑过一整个窗口按缓冲区精确重算一次，代价均摊后仍为 O(1)
+        if self._evictions >= self.window_size:
+            self._rebuild()
+    
+    def _rebuild(self):
+        """以窗口首个样本为基准重新计算累加量"""
+        self._shift = self.data_buffer[0]
+        deviations = [y - self._shift for y in self.data_buffer]
+        self._sum_y = math.fsum(deviations)
+        self._sum_yy = math.fsum(d * d for d in deviations)
+        self._sum_xy = math.fsum(x * d for x, d in enumerate(deviations))
+        self._evictions = 0
     
     def process(self, value: float, timestamp: Optional[float] = None) -> ProcessingResult:
         """分析数据趋势"""
-        import time
         if timestamp is None:
             timestamp = time.time()
         
-        self.data_buffer.append(value)
+        self._push(value)
         self.time_buffer.append(timestamp)
         
         if len(self.data_buffer) < 3:
@@ -167,38 +634,12 @@ class TrendAnalyzer:
                 original_value=value,
                 processed_value=value,
                 confidence=0.3,
-                metadata={
-                    'algorithm': 'trend_analysis',
-                    'trend': 'unknown',
-                    'slope': 0,
-                    'r_squared': 0
-                }
+                metadata=_TREND_UNKNOWN_METADATA
             )
         
-        # 计算线性回归
         n = len(self.data_buffer)
-        x_values = list(range(n))
-        y_values = list(self.data_buffer)
-        
-        # 计算斜率和截距
-        x_mean = sum(x_values) / n
-        y_mean = sum(y_values) / n
-        
-        numerator = sum((x_values[i] - x_mean) * (y_values[i] - y_mean) for i in range(n))
-        denominator = sum((x_values[i] - x_mean) ** 2 for i in range(n))
-        
-        if denominator == 0:
-            slope = 0
-            r_squared = 0
-        else:
-            slope = numerator / denominator
-            
-            # 计算R²
-            y_pred = [slope * (i - x_mean) + y_mean for i in range(n)]
-            ss_res = sum((y_values[i] - y_pred[i]) ** 2 for i in range(n))
-            ss_tot = sum((y_values[i] - y_mean) ** 2 for i in range(n))
-            r_squared = 1 - (ss_res / ss_tot) if ss_tot != 0 else 0
-        
+        slope, r_squared = self._regression()
+
         # 确定趋势
         if abs(slope) < 0.01:
             trend = 'stable'
@@ -221,6 +662,70 @@ class TrendAnalyzer:
                 'sample_count': n
             }
         )
+    
+    def process_batch(self, values: Iterable[float],
+                      timestamps: Optional[Iterable[float]] = None) -> List[float]:
+        """批量分析趋势，返回每个样本到达后的窗口斜率（样本不足 3 个时为 0，与 process 共享窗口状态）
+        
+        安装 numpy 时，窗口填满后的斜率由滑动窗口视图与固定权重 (x - x̄) / Sxx 一次矩阵乘法算出。
+        """
+        if np is None or self.window_size < 3:
+            values = list(values)
+            self._extend_times(len(values), timestamps)
+            return self._scan(values)
+        
+        values = _as_float_array(values)
+        self._extend_times(len(values), timestamps)
+        leading = _leading_partial(self.data_buffer, self.window_size, len(values))
+        slopes = self._scan(values[:leading].tolist())
+        values = values[leading:]
+        if not values.size:
+            return slopes
+        
+        window_size = self.window_size
+        history = np.fromiter(self.data_buffer, dtype=np.float64, count=len(self.data_buffer))
+        samples = np.concatenate((history, values))
+        windows = sliding_window_view(samples, window_size)[len(history) - window_size + 1:]
+        weights = (np.arange(window_size) - (window_size - 1) / 2) / (window_size * (window_size ** 2 - 1) / 12)
+        
+        self.data_buffer.extend(values[-window_size:].tolist())
+        self._rebuild()
+        
+        slopes.extend((windows @ weights).tolist())
+        return slopes
+    
+    def _extend_times(self, count: int, timestamps: Optional[Iterable[float]]):
+        """记录批量样本的时间戳（未给出时统一使用当前时间）"""
+        if timestamps is None:
+            self.time_buffer.extend([time.time()] * min(count, self.window_size))
+        else:
+            self.time_buffer.extend(timestamps)
+    
+    def _scan(self, values: Iterable[float]) -> List[float]:
+        """process_batch 的纯 Python 实现"""
+        slopes = []
+        for value in values:
+            self._push(value)
+            slopes.append(self._regression()[0] if len(self.data_buffer) >= 3 else 0.0)
+        return slopes
+    
+    def _regression(self) -> Tuple[float, float]:
+        """由累加量闭式计算线性回归（x 为 0..n-1），返回 (斜率, R²)"""
+        n = len(self.data_buffer)
+        x_mean = (n - 1) / 2
+        sxx = n * (n * n - 1) / 12  # Σ(x - x̄)²
+        sxy = self._sum_xy - x_mean * self._sum_y  # Σ(x - x̄)(y - ȳ)
+        ss_tot = self._sum_yy - self._sum_y * self._sum_y / n  # Σ(y - ȳ)²
+        
+        slope = sxy / sxx
+        
+        # 计算R²（单变量最小二乘: R² = Sxy² / (Sxx·Syy)）
+        if ss_tot > 0:
+            r_squared = min(max(sxy * sxy / (sxx * ss_tot), 0.0), 1.0)
+        else:
+            r_squared = 0
+        
+        return slope, r_squared
 
 class StatisticalAnalyzer:
     """统计分析器"""
@@ -228,10 +733,55 @@ class StatisticalAnalyzer:
     def __init__(self, window_size: int = 50):
         self.window_size = window_size
         self.data_buffer = deque(maxlen=window_size)
+        self._stats = _RunningStats()
+        self._median = _RollingMedian()
+        self._evictions = 0
+        # 单调队列，元素为 (样本序号, 值)：队首即窗口内最小/最大值
+        self._index = 0
+        self._min_queue = deque()
+        self._max_queue = deque()
+    
+    def _push(self, value: float):
+        """将新样本加入窗口，以 O(1) 均摊更新均值、方差和最值，O(log W) 更新中位数"""
+        cancelled = False
+        if len(self.data_buffer) == self.window_size:
+            oldest = self.data_buffer[0]
+            cancelled = self._stats.remove(oldest)
+            self._median.remove(oldest)
+            self._evictions += 1
+        self.data_buffer.append(value)
+        self._stats.add(value)
+        self._median.add(value)
+        
+        if self._evictions >= self.window_size:
+            self._stats.reset(self.data_buffer)
+            self._median.reset(self.data_buffer)
+            self._evictions = 0
+        elif cancelled:
+            # 窗口刚变为全同数值时方差应精确为 0，而不是增量相减留下的残差
+            self._stats.reset(self.data_buffer)
+        
+        index = self._index
+        self._index += 1
+        oldest = index - self.window_size  # 序号不大于它的样本已移出窗口
+        
+        min_queue = self._min_queue
+        while min_queue and min_queue[-1][1] >= value:
+            min_queue.pop()
+        min_queue.append((index, value))
+        if min_queue[0][0] <= oldest:
+            min_queue.popleft()
+        
+        max_queue = self._max_queue
+        while max_queue and max_queue[-1][1] <= value:
+            max_queue.pop()
+        max_queue.append((index, value))
+        if max_queue[0][0] <= oldest:
+            max_queue.popleft()
     
     def process(self, value: float) -> Dict[str, Any]:
         """进行统计分析"""
-        self.data_buffer.append(value)
+        self._push(value)
         
         if len(self.data_buffer) < 2:
             return {
@@ -244,33 +794,60 @@ class StatisticalAnalyzer:
                 'range': 0
             }
         
-        data_list = list(self.data_buffer)
+        stats = self._stats
+        minimum = self._min_queue[0][1]
+        maximum = self._max_queue[0][1]
+        variance = stats.variance
         
         return {
-            'count': len(data_list),
-            'mean': statistics.mean(data_list),
-            'median': statistics.median(data_list),
-            'std_dev': statistics.stdev(data_list),
-            'min': min(data_list),
-            'max': max(data_list),
-            'range': max(data_list) - min(data_list),
-            'variance': statistics.variance(data_list)
+            'count': stats.count,
+            'mean': stats.mean,
+            'median': self._median.median,
+            'std_dev': math.sqrt(variance),
+            'min': minimum,
+            'max': maximum,
+            'range': maximum - minimum,
+            'variance': variance
         }
 
 class DataFusionProcessor:
-    """数据融合处理器"""
+    """数据融合处理器
+    
+    各传感器组合的有效权重（权重 × 可靠性）及其总和会被缓存，
+    只能通过 set_sensor_weight / update_sensor_reliability 修改，以便缓存失效。
+    """
+    
+    # 缓存的传感器组合数量上限，超出时整体清空
+    WEIGHTS_CACHE_SIZE = 256
     
     def __init__(self):
         self.sensor_weights = {}
         self.sensor_reliability = {}
+        # 传感器名称元组 -> (各传感器有效权重, 有效权重总和)
+        self._weights_cache: Dict[Tuple[str, ...], Tuple[Tuple[float, ...], float]] = {}
     
     def set_sensor_weight(self, sensor_name: str, weight: float):
         """设置传感器权重"""
         self.sensor_weights[sensor_name] = max(0.0, min(1.0, weight))
+        self._weights_cache.clear()
     
     def update_sensor_reliability(self, sensor_name: str, reliability: float):
         """更新传感器可靠性"""
         self.sensor_reliability[sensor_name] = max(0.0, min(1.0, reliability))
+        self._weights_cache.clear()
+    
+    def _weights_for(self, sensor_names: Tuple[str, ...]) -> Tuple[Tuple[float, ...], float]:
+        """返回一组传感器的有效权重及其总和（按组合缓存）"""
+        cached = self._weights_cache.get(sensor_names)
+        if cached is None:
+            weights = tuple(
+                self.sensor_weights.get(name, 1.0) * self.sensor_reliability.get(name, 0.8)
+                for name in sensor_names
+            )
+            if len(self._weights_cache) >= self.WEIGHTS_CACHE_SIZE:
+                self._weights_cache.clear()
+            cached = self._weights_cache[sensor_names] = (weights, sum(weights))
+        return cached
     
     def fuse_data(self, sensor_data: Dict[str, float]) -> ProcessingResult:
         """融合多传感器数据"""
@@ -292,36 +869,51 @@ class DataFusionProcessor:
             )
         
         # 加权平均融合
-        total_weight = 0
-        weighted_sum = 0
-        
-        for sensor_name, value in sensor_data.items():
-            weight = self.sensor_weights.get(sensor_name, 1.0)
-            reliability = self.sensor_reliability.get(sensor_name, 0.8)
-            effective_weight = weight * reliability
-            
-            weighted_sum += value * effective_weight
-            total_weight += effective_weight
+        sensor_names = tuple(sensor_data)
+        weights, total_weight = self._weights_for(sensor_names)
+        values = sensor_data.values()
         
         if total_weight == 0:
             # 所有权重为0，使用简单平均
-            fused_value = sum(sensor_data.values()) / len(sensor_data)
+            fused_value = sum(values) / len(sensor_data)
             confidence = 0.5
         else:
-            fused_value = weighted_sum / total_weight
+            fused_value = sum(map(operator.mul, values, weights)) / total_weight
             confidence = min(total_weight / len(sensor_data), 1.0)
         
         return ProcessingResult(
-            original_value=list(sensor_data.values())[0],  # 使用第一个传感器作为原始值
+            original_value=next(iter(values)),  # 使用第一个传感器作为原始值
             processed_value=fused_value,
             confidence=confidence,
             metadata={
                 'algorithm': 'data_fusion',
                 'sensor_count': len(sensor_data),
                 'total_weight': total_weight,
-                'sensors_used': list(sensor_data.keys())
+                'sensors_used': list(sensor_names)
             }
         )
+    
+    def fuse_data_many(self, sensor_names: List[str], rows: Iterable[Iterable[float]]) -> Tuple[List[float], float]:
+        """批量融合同一组传感器的多帧数据
+        
+        rows 中每一行按 sensor_names 的顺序给出各传感器读数。
+        有效权重只计算一次，返回 (融合值列表, 置信度)。
+        """
+        if not sensor_names:
+            raise ValueError("传感器数据不能为空")
+        
+        weights, total_weight = self._weights_for(tuple(sensor_names))
+        sensor_count = len(sensor_names)
+        
+        if total_weight == 0:
+            # 所有权重为0，使用简单平均
+            return [sum(row) / sensor_count for row in rows], 0.5
+        
+        fused_values = [
+            sum(value * weight for value, weight in zip(row, weights)) / total_weight
+            for row in rows
+        ]
+        return fused_values, min(total_weight / sensor_count, 1.0)
 
 class AdaptiveFilter:
     """自适应滤波器"""
@@ -330,23 +922,74 @@ class AdaptiveFilter:
         self.alpha = initial_alpha  # 学习率
         self.filtered_value = None
         self.error_history = deque(maxlen=10)
+        # 误差历史全部样本与最近 3 个样本的累加和
+        self._error_sum = 0.0
+        self._recent_error_sum = 0.0
+        self._evictions = 0
+    
+    def _push_error(self, error: float):
+        """记录误差，并以 O(1) 更新两个累加和"""
+        history = self.error_history
+        if len(history) >= 3:
+            # 倒数第 3 个样本将移出最近 3 个的范围
+            self._recent_error_sum -= history[-3]
+        if len(history) == history.maxlen:
+            self._error_sum -= history[0]
+            self._evictions += 1
+        history.append(error)
+        self._error_sum += error
+        self._recent_error_sum += error
+        
+        # 每滑过一整个窗口精确重算一次，消除累积的浮点误差
+        if self._evictions >= history.maxlen:
+            self._error_sum = math.fsum(history)
+            self._recent_error_sum = math.fsum(list(history)[-3:])
+            self._evictions = 0
         
     def process(self, value: float) -> ProcessingResult:
         """自适应滤波处理"""
+        confidence = self._step(value)
+        
+        return ProcessingResult(
+            original_value=value,
+            processed_value=self.filtered_value,
+            confidence=confidence,
+            metadata={
+                'algorithm': 'adaptive_filter',
+                'alpha': self.alpha,
+                'error_history_size': len(self.error_history)
+            }
+        )
+    
+    def process_batch(self, values: Iterable[float]) -> List[float]:
+        """批量滤波，仅返回滤波值（与 process 共享滤波状态）
+        
+        学习率随每个样本的误差调整，属于逐点递推，无法向量化。
+        """
+        process_fast = self.process_fast
+        return [process_fast(value) for value in values]
+    
+    def process_fast(self, value: float) -> float:
+        """滤波单个数值，只返回滤波值（不构造 ProcessingResult）"""
+        self._step(value)
+        return self.filtered_value
+    
+    def _step(self, value: float) -> float:
+        """用一个样本更新滤波状态，返回置信度"""
         if self.filtered_value is None:
             self.filtered_value = value
             confidence = 0.5
         else:
             # 计算误差
             error = abs(value - self.filtered_value)
-            self.error_history.append(error)
+            self._push_error(error)
             
             # 自适应调整学习率
-            if len(self.error_history) > 3:
-                recent_avg_error = sum(list(self.error_history)[-3:]) / 3
-                long_term_avg_error = sum(self.error_history) / len(self.error_history)
-                
-                if recent_avg_error > long_term_avg_error * 1.5:
+            history_size = len(self.error_history)
+            if history_size > 3:
+                # 最近 3 个误差的均值是否超过全部误差均值的 1.5 倍：
+                # recent/3 > 1.5 * total/n，两边同乘 3n 以省去除法
+                if self._recent_error_sum * history_size > 4.5 * self._error_sum:
                     # 误差增大，提高学习率
                     self.alpha = min(0.5, self.alpha * 1.1)
                 else:
@@ -357,13 +1000,4 @@ class AdaptiveFilter:
             self.filtered_value = self.alpha * value + (1 - self.alpha) * self.filtered_value
             confidence = 1.0 - min(error / (abs(value) + 1e-6), 1.0)
         
-        return ProcessingResult(
-            original_value=value,
-            processed_value=self.filtered_value,
-            confidence=confidence,
-            metadata={
-                'algorithm': 'adaptive_filter',
-                'alpha': self.alpha,
-                'error_history_size': len(self.error_history)
-            }
-        ) 
\ No newline at end of file
+        return confidence 
\ No newline at end of file
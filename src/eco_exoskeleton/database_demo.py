@@ -6,38 +6,69 @@
 """
 
 import time
-import random
 import json
-from datetime import datetime, timedelta
+from functools import lru_cache
+import numpy as np
 from eco_exoskeleton.database_manager import get_database_manager
 
+rng = np.random.default_rng()
+
+def _uniform(low: float, high: float, n: int, decimals: int = 2) -> list:
+    """一次生成 n 个均匀分布随机数并统一取整，返回 Python float 列表"""
+    return np.round(rng.uniform(low, high, n), decimals).tolist()
+
+def _flags(n: int) -> list:
+    """一次生成 n 个随机布尔值"""
+    return rng.integers(0, 2, size=n).astype(bool).tolist()
+
+@lru_cache(maxsize=4096)
+def _hms(sec: int) -> str:
+    """格式化为 时:分:秒，同一秒内的记录复用结果"""
+    return time.strftime('%H:%M:%S', time.localtime(sec))
+
+def _rows(columns: dict) -> list:
+    """把按列生成的数据转换为逐条的字典"""
+    return [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+def _greenhouse_samples(n: int) -> list:
+    """生成 n 条温室模块数据"""
+    return _rows({
+        'temperature': _uniform(20, 35, n),
+        'humidity': _uniform(40, 80, n),
+        'deployed': _flags(n),
+        'retracted': _flags(n)
+    })
+
+def _injection_samples(n: int) -> list:
+    """生成 n 条注射模块数据"""
+    return _rows({
+        'depth': _uniform(0, 50, n),
+        'pressure': _uniform(10, 100, n),
+        'needle_position': _flags(n)
+    })
+
+def _bubble_samples(n: int) -> list:
+    """生成 n 条气泡模块数据"""
+    return _rows({
+        'flow_rate': _uniform(0, 10, n),
+        'tank_level': _uniform(0, 100, n),
+        'system_pressure': _uniform(20, 80, n)
+    })
+
+# 模块名 -> 数据生成函数
+_FACTORIES = {
+    'greenhouse': _greenhouse_samples,
+    'injection': _injection_samples,
+    'bubble': _bubble_samples
+}
+
+def generate_sensor_batch(n: int) -> dict:
+    """批量生成模拟传感器数据，返回 {模块: [数据, ...]}，每个模块 n 条"""
+    return {module: factory(n) for module, factory in _FACTORIES.items()}
+
 def generate_sensor_data():
-    """生成模拟传感器数据"""
-    modules = ['greenhouse', 'injection', 'bubble']
-    
-    sensor_data = {}
-    for module in modules:
-        if module == 'greenhouse':
-            sensor_data[module] = {
-                'temperature': round(random.uniform(20, 35), 2),
-                'humidity': round(random.uniform(40, 80), 2),
-                'deployed': random.choice([True, False]),
-                'retracted': random.choice([True, False])
-            }
-        elif module == 'injection':
-            sensor_data[module] = {
-                'depth': round(random.uniform(0, 50), 2),
-                'pressure': round(random.uniform(10, 100), 2),
-                'needle_position': random.choice([True, False])
-            }
-        else:  # bubble
-            sensor_data[module] = {
-                'flow_rate': round(random.uniform(0, 10), 2),
-                'tank_level': round(random.uniform(0, 100), 2),
-                'system_pressure': round(random.uniform(20, 80), 2)
-            }
-    
-    return sensor_data
+    """生成模拟传感器数据（每个模块一条）"""
+    return {module: samples[0] for module, samples in generate_sensor_batch(1).items()}
 
 def generate_algorithm_results():
     """生成模拟算法结果"""
@@ -45,25 +76,28 @@ def generate_algorithm_results():
     modules = ['greenhouse', 'injection', 'bubble']
     data_fields = ['temperature', 'humidity', 'depth', 'pressure', 'flow_rate']
     
-    results = []
-    for _ in range(random.randint(5, 15)):
-        original_value = random.uniform(10, 100)
-        processed_value = original_value + random.uniform(-5, 5)
-        
-        result = {
-            'algorithm_name': random.choice(algorithms),
-            'module': random.choice(modules),
-            'data_field': random.choice(data_fields),
-            'original_value': round(original_value, 2),
-            'processed_value': round(processed_value, 2),
-            'confidence': round(random.uniform(0.7, 1.0), 3),
-            'metadata': {
-                'processing_time': round(random.uniform(0.001, 0.1), 3),
-                'algorithm_version': '1.0',
-                'noise_level': round(random.uniform(0, 0.5), 2)
-            }
+    n = int(rng.integers(5, 16))
+    original_values = rng.uniform(10, 100, n)
+    processed_values = original_values + rng.uniform(-5, 5, n)
+    
+    columns = {
+        'algorithm_name': rng.choice(algorithms, n).tolist(),
+        'module': rng.choice(modules, n).tolist(),
+        'data_field': rng.choice(data_fields, n).tolist(),
+        'original_value': np.round(original_values, 2).tolist(),
+        'processed_value': np.round(processed_values, 2).tolist(),
+        'confidence': _uniform(0.7, 1.0, n, decimals=3)
+    }
+    processing_times = _uniform(0.001, 0.1, n, decimals=3)
+    noise_levels = _uniform(0, 0.5, n)
+    
+    results = _rows(columns)
+    for result, processing_time, noise_level in zip(results, processing_times, noise_levels):
+        result['metadata'] = {
+            'processing_time': processing_time,
+            'algorithm_version': '1.0',
+            'noise_level': noise_level
         }
-        results.append(result)
     
     return results
 
@@ -79,8 +113,11 @@ def demo_data_storage():
     print("🔄 存储传感器数据...")
     sensor_data = generate_sensor_data()
     
+    timestamp = time.time()
+    success = db_manager.store_sensor_data_bulk(
+        [(module, data, timestamp) for module, data in sensor_data.items()]
+    )
     for module, data in sensor_data.items():
-        success = db_manager.store_sensor_data(module, data)
         if success:
             print(f"✅ {module} 模块数据存储成功: {data}")
         else:
@@ -109,6 +146,9 @@ def demo_data_storage():
         else:
             print(f"❌ 算法结果存储失败")
     
+    # 等待写入线程把数据落库，后续查询演示才能读到
+    db_manager.flush()
+    
     print(f"📊 总共存储了 {len(algorithm_results)} 个算法结果")
 
 def demo_data_query():
@@ -124,8 +164,8 @@ def demo_data_query():
     sensor_data = db_manager.get_sensor_data(limit=10)
     
     for i, data in enumerate(sensor_data[:5]):  # 只显示前5条
-        timestamp = datetime.fromtimestamp(data['timestamp']).strftime('%H:%M:%S')
-        print(f"  {i+1}. [{timestamp}] {data['module']}.{data['data_type']}: {data['value']}")
+        timestamp = _hms(int(data.timestamp))
+        print(f"  {i+1}. [{timestamp}] {data.module}.{data.data_type}: {data.value}")
     
     if len(sensor_data) > 5:
         print(f"  ... 还有 {len(sensor_data) - 5} 条记录")
@@ -137,9 +177,9 @@ def demo_data_query():
     greenhouse_data = db_manager.get_sensor_data(module='greenhouse', limit=5)
     
     for data in greenhouse_data:
-        timestamp = datetime.fromtimestamp(data['timestamp']).strftime('%H:%M:%S')
-        if data['data_type'] != 'raw':
-            print(f"  [{timestamp}] {data['data_type']}: {data['value']}")
+        timestamp = _hms(int(data.timestamp))
+        if data.data_type != 'raw':
+            print(f"  [{timestamp}] {data.data_type}: {data.value}")
     
     print()
     
@@ -148,8 +188,8 @@ def demo_data_query():
     algorithm_results = db_manager.get_algorithm_results(limit=5)
     
     for result in algorithm_results:
-        timestamp = datetime.fromtimestamp(result['timestamp']).strftime('%H:%M:%S')
-        print(f"  [{timestamp}] {result['algorithm_name']}: {result['original_value']} → {result['processed_value']} (置信度: {result['confidence']})")
+        timestamp = _hms(int(result.timestamp))
+        print(f"  [{timestamp}] {result.algorithm_name}: {result.original_value} → {result.processed_value} (置信度: {result.confidence})")
 
 def demo_statistics():
     """演示统计功能"""
@@ -214,8 +254,8 @@ def demo_time_range_query():
     if recent_data:
         print(f"  找到 {len(recent_data)} 条记录")
         for data in recent_data[:3]:
-            timestamp = datetime.fromtimestamp(data['timestamp']).strftime('%H:%M:%S')
-            print(f"  [{timestamp}] {data['module']}.{data['data_type']}: {data['value']}")
+            timestamp = _hms(int(data.timestamp))
+            print(f"  [{timestamp}] {data.module}.{data.data_type}: {data.value}")
     else:
         print("  📭 暂无数据")
     
@@ -231,8 +271,8 @@ def demo_time_range_query():
     if ma_results:
         print(f"  找到 {len(ma_results)} 条结果")
         for result in ma_results:
-            timestamp = datetime.fromtimestamp(result['timestamp']).strftime('%H:%M:%S')
-            print(f"  [{timestamp}] {result['module']}.{result['data_field']}: {result['original_value']} → {result['processed_value']}")
+            timestamp = _hms(int(result.timestamp))
+            print(f"  [{timestamp}] {result.module}.{result.data_field}: {result.original_value} → {result.processed_value}")
     else:
         print("  📭 暂无结果")
 
@@ -3,29 +3,115 @@
 
 支持SQLite持久化存储传感器数据和算法结果。
 提供数据查询、统计、清理等功能，解决内存缓存易失问题。
+数据库使用 WAL 日志模式，运行时会在数据库文件旁生成 -wal/-shm 文件。
 """
 
 import sqlite3
 import json
 import time
+import queue
 import threading
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Tuple, Iterator, Iterable, Union
+from collections import namedtuple
 from dataclasses import asdict
+from contextlib import contextmanager
+from functools import cache
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# 可选的 orjson 加速 JSON 编解码，未安装时回退到标准库
+try:
+    import orjson
+
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj, option=_ORJSON_OPTIONS).decode('utf-8')
+
+    _loads = orjson.loads
+except ImportError:
+    _dumps = json.dumps
+    _loads = json.loads
+
+# 每个连接都要设置的 PRAGMA：WAL 下 NORMAL 同步即可保证一致性，
+# 临时表放内存，64MB 页缓存，256MB 内存映射，锁冲突时最多等待 5 秒
+_CONNECTION_PRAGMAS = (
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA cache_size=-65536',
+    'PRAGMA mmap_size=268435456',
+    'PRAGMA busy_timeout=5000',
+)
+
+# 清理后回收空闲页的最小间隔（秒），两次之间释放的页会被新写入直接复用
+_INCREMENTAL_VACUUM_INTERVAL = 24 * 3600
+
+# 清理旧数据时每个事务最多删除的行数，以及两批之间让出写锁的时间（秒）
+CLEANUP_CHUNK_SIZE = 5000
+CLEANUP_CHUNK_PAUSE = 0.005
+
+# 后台写入队列容量（按次调用计）及写入线程每个事务最多合并的调用次数
+WRITE_QUEUE_SIZE = 10000
+WRITE_BATCH_SIZE = 500
+
+# 热路径写入语句：各方法共用同一个字符串，命中连接的预编译语句缓存
+SQL_INSERT_SENSOR_RAW = '''
+    INSERT INTO sensor_raw (timestamp, module, raw_data)
+    VALUES (?, ?, ?)
+'''
+
+SQL_INSERT_SENSOR_NUM = '''
+    INSERT INTO sensor_data (timestamp, module, data_type, value, raw_id)
+    VALUES (?, ?, ?, ?, ?)
+'''
+
+SQL_UPSERT_SENSOR_STATS = '''
+    INSERT INTO sensor_stats_1m (minute_bin, module, data_type, count, sum, min, max)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (minute_bin, module, data_type) DO UPDATE SET
+        count = count + excluded.count,
+        sum = sum + excluded.sum,
+        min = MIN(min, excluded.min),
+        max = MAX(max, excluded.max)
+'''
+
+SQL_INSERT_ALGO = '''
+    INSERT INTO algorithm_results
+    (timestamp, algorithm_name, module, data_field, original_value,
+     processed_value, confidence, metadata)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+SQL_INSERT_STATUS = '''
+    INSERT INTO system_status (timestamp, status_type, module, status_data)
+    VALUES (?, ?, ?, ?)
+'''
+
+# 不带原始JSON/元数据的查询直接返回轻量的命名元组，字段顺序与 SELECT 列一致
+SensorRow = namedtuple('SensorRow', 'timestamp module data_type value')
+AlgorithmRow = namedtuple('AlgorithmRow', 'timestamp algorithm_name module data_field '
+                                          'original_value processed_value confidence')
+
 class DatabaseManager:
     """数据库管理器"""
     
     def __init__(self, db_path: str = "sensor_data.db"):
         self.db_path = db_path
         self.lock = threading.Lock()
+        # 每个线程复用一个长连接，避免每次调用都重新打开数据库
+        self._tls = threading.local()
+        self._last_vacuum = 0.0
         self._ensure_directory_exists()
         self._init_database()
         
+        # 传感器数据和算法结果由单独的写入线程批量入库，调用方不等待磁盘写入
+        self._write_queue: "queue.Queue[Tuple[str, List[tuple]]]" = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+        self._writer = threading.Thread(target=self._writer_loop, name="database-writer", daemon=True)
+        self._writer.start()
+        
         logger.info(f"数据库管理器初始化完成: {db_path}")
     
     def _ensure_directory_exists(self):
@@ -33,11 +119,60 @@ class DatabaseManager:
         db_dir = Path(self.db_path).parent
         db_dir.mkdir(parents=True, exist_ok=True)
     
+    def _connect(self) -> sqlite3.Connection:
+        """打开数据库连接并应用连接级 PRAGMA
+        
+        连接使用自动提交模式（isolation_level=None），写操作通过
+        _write_transaction 显式 BEGIN/COMMIT。
+        """
+        conn = sqlite3.connect(self.db_path, isolation_level=None, cached_statements=256)
+        for pragma in _CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+    
+    def _conn(self) -> sqlite3.Connection:
+        """获取当前线程复用的数据库连接"""
+        conn = getattr(self._tls, 'conn', None)
+        if conn is None:
+            conn = self._tls.conn = self._connect()
+        return conn
+    
+    @contextmanager
+    def _write_transaction(self) -> Iterator[sqlite3.Connection]:
+        """持有写锁并在一个事务中执行写操作，异常时回滚"""
+        with self.lock:
+            conn = self._conn()
+            conn.execute('BEGIN')
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+    
+    def close(self):
+        """关闭当前线程的数据库连接"""
+        conn = getattr(self._tls, 'conn', None)
+        if conn is not None:
+            self._tls.conn = None
+            conn.close()
+    
     def _init_database(self):
         """初始化数据库表结构"""
         with self.lock:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._conn()
             try:
+                # 增量回收模式：清理后用 incremental_vacuum 分批归还空闲页，不再整库 VACUUM。
+                # 新库在建表前设置即可生效；已有的库切换需要一次整库 VACUUM，
+                # 放在 cleanup_old_data 中执行，不在启动时阻塞
+                conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+                
+                # WAL 模式是持久化到数据库文件的，只需设置一次；
+                # 启用后数据库旁会出现 -wal 和 -shm 两个辅助文件
+                conn.execute('PRAGMA journal_mode=WAL')
+                
+                conn.execute('BEGIN')
+                
                 # 创建传感器数据表
                 conn.execute('''
                     CREATE TABLE IF NOT EXISTS sensor_data (
@@ -47,10 +182,53 @@ class DatabaseManager:
                         data_type TEXT NOT NULL,
                         value REAL,
                         raw_data TEXT,
+                        raw_id INTEGER,
                         created_at DATETIME DEFAULT CURRENT_TIMESTAMP
                     )
                 ''')
                 
+                # 旧版本数据库没有 raw_id 列时补上（旧行的原始JSON仍保存在 raw_data 列）
+                columns = {row[1] for row in conn.execute('PRAGMA table_info(sensor_data)')}
+                if 'raw_id' not in columns:
+                    conn.execute('ALTER TABLE sensor_data ADD COLUMN raw_id INTEGER')
+                
+                # 创建原始传感器数据表（每个样本一行，数值行通过 raw_id 引用）
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS sensor_raw (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        timestamp REAL NOT NULL,
+                        module TEXT NOT NULL,
+                        raw_data TEXT NOT NULL
+                    )
+                ''')
+                
+                # 创建按分钟汇总的传感器统计表（写入时累加，统计查询直接读取汇总行）
+                has_stats_table = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sensor_stats_1m'"
+                ).fetchone() is not None
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS sensor_stats_1m (
+                        minute_bin INTEGER NOT NULL,
+                        module TEXT NOT NULL,
+                        data_type TEXT NOT NULL,
+                        count INTEGER NOT NULL,
+                        sum REAL NOT NULL,
+                        min REAL NOT NULL,
+                        max REAL NOT NULL,
+                        PRIMARY KEY (minute_bin, module, data_type)
+                    ) WITHOUT ROWID
+                ''')
+                if not has_stats_table:
+                    # 首次创建时用已有数据回填
+                    conn.execute('''
+                        INSERT INTO sensor_stats_1m (minute_bin, module, data_type, count, sum, min, max)
+                        SELECT CAST(timestamp / 60 AS INTEGER), module, data_type,
+                               COUNT(*), SUM(value), MIN(value), MAX(value)
+                        FROM sensor_data
+                        WHERE value IS NOT NULL
+                        GROUP BY 1, 2, 3
+                    ''')
+                
                 # 创建算法结果表
                 conn.execute('''
                     CREATE TABLE IF NOT EXISTS algorithm_results (
@@ -80,81 +258,177 @@ class DatabaseManager:
                 ''')
                 
                 # 创建索引
-                conn.execute('CREATE INDEX IF NOT EXISTS idx_sensor_timestamp ON sensor_data(timestamp)')
-                conn.execute('CREATE INDEX IF NOT EXISTS idx_sensor_module ON sensor_data(module)')
+                existing_indexes = {row[0] for row in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'index'"
+                )}
+                
+                # sensor_data 写入最频繁，只保留两个有查询使用的二级索引：
+                # idx_sensor_ts_cover —— get_sensor_data 带时间范围（含单模块 + 时间范围）
+                # 或只按模块过滤的查询、清理时的 timestamp < ?、get_database_info 的 MIN/MAX(timestamp)，
+                # 覆盖索引按时间顺序读取，无需回表
+                conn.execute('CREATE INDEX IF NOT EXISTS idx_sensor_ts_cover ON sensor_data(timestamp, module, data_type, value)')
+                # idx_sensor_mod_type_ts —— get_sensor_data(module, data_type) 按时间倒序取最近 N 条，
+                # 无需额外排序和回表
+                conn.execute('CREATE INDEX IF NOT EXISTS idx_sensor_mod_type_ts ON sensor_data(module, data_type, timestamp DESC, value)')
+                # 旧版本建立的索引：单列时间/模块索引已被上面两个索引取代；
+                # (module, timestamp) 查询由 idx_sensor_ts_cover 承担；
+                # raw_id 只用于按 sensor_raw 主键关联，没有查询按它过滤
+                for index_name in ('idx_sensor_timestamp', 'idx_sensor_module', 'idx_sensor_mod_ts', 'idx_sensor_raw_id'):
+                    conn.execute(f'DROP INDEX IF EXISTS {index_name}')
+                conn.execute('CREATE INDEX IF NOT EXISTS idx_raw_timestamp ON sensor_raw(timestamp)')
                 conn.execute('CREATE INDEX IF NOT EXISTS idx_algorithm_timestamp ON algorithm_results(timestamp)')
-                conn.execute('CREATE INDEX IF NOT EXISTS idx_algorithm_name ON algorithm_results(algorithm_name)')
+                conn.execute('CREATE INDEX IF NOT EXISTS idx_algo_name_mod_ts ON algorithm_results(algorithm_name, module, timestamp DESC, confidence)')
+                conn.execute('DROP INDEX IF EXISTS idx_algorithm_name')
                 conn.execute('CREATE INDEX IF NOT EXISTS idx_status_timestamp ON system_status(timestamp)')
                 
                 conn.commit()
+                
+                # 新建组合索引后收集一次统计信息，供查询规划器选择索引
+                if not {'idx_sensor_mod_type_ts', 'idx_sensor_ts_cover'} <= existing_indexes:
+                    conn.execute('ANALYZE')
+                
                 logger.info("数据库表结构初始化完成")
                 
             except Exception as e:
                 logger.error(f"数据库初始化失败: {e}")
                 conn.rollback()
+    
+    @staticmethod
+    def _insert_samples(conn: sqlite3.Connection, samples: Iterable[Tuple[str, Dict[str, Any], float]]) -> int:
+        """在当前事务中写入传感器样本，返回写入的数值行数
+        
+        每个样本的原始JSON写入 sensor_raw 一次，各数值字段写入 sensor_data
+        并通过 raw_id 引用该原始行，同时累加到 sensor_stats_1m 分钟汇总。
+        """
+        numeric_rows = []
+        for module, data, timestamp in samples:
+            raw_id = conn.execute(SQL_INSERT_SENSOR_RAW, (timestamp, module, _dumps(data))).lastrowid
+            # 所有 int/float（含开关量 bool）字段都写入；数值字符串等其他类型跳过
+            numeric_rows.extend((timestamp, module, key, float(value), raw_id)
+                                for key, value in data.items() if isinstance(value, (int, float)))
+        
+        conn.executemany(SQL_INSERT_SENSOR_NUM, numeric_rows)
+        
+        # 先在内存中按 (分钟, 模块, 数据类型) 合并，再逐组累加到汇总表
+        rollup: Dict[Tuple[int, str, str], List[float]] = {}
+        for timestamp, module, key, value, _ in numeric_rows:
+            group_key = (int(timestamp // 60), module, key)
+            group = rollup.get(group_key)
+            if group is None:
+                rollup[group_key] = [1, value, value, value]
+            else:
+                group[0] += 1
+                group[1] += value
+                group[2] = min(group[2], value)
+                group[3] = max(group[3], value)
+        
+        conn.executemany(SQL_UPSERT_SENSOR_STATS,
+                         [(*group_key, *group) for group_key, group in rollup.items()])
+        return len(numeric_rows)
+    
+    def _enqueue(self, kind: str, items: List[tuple]) -> bool:
+        """把一次写入交给写入线程，队列已满时丢弃并返回 False"""
+        try:
+            self._write_queue.put_nowait((kind, items))
+            return True
+        except queue.Full:
+            logger.warning(f"数据库写入队列已满，丢弃 {len(items)} 条{'传感器数据' if kind == 'sensor' else '算法结果'}")
+            return False
+    
+    def _writer_loop(self):
+        """数据库写入线程：合并队列中积压的写入，每批一个事务提交"""
+        while True:
+            batch = [self._write_queue.get()]
+            while len(batch) < WRITE_BATCH_SIZE:
+                try:
+                    batch.append(self._write_queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            samples = []
+            algorithm_rows = []
+            for kind, items in batch:
+                if kind == 'sensor':
+                    samples.extend(items)
+                else:
+                    algorithm_rows.extend(items)
+            
+            try:
+                row_count = self._write_batch(samples, algorithm_rows)
+                logger.debug(f"批量写入数据库: {len(samples)} 条传感器样本 ({row_count} 行), {len(algorithm_rows)} 条算法结果")
+            except Exception as e:
+                # 整批已回滚；逐条重试，只丢弃真正出错的数据
+                logger.warning(f"批量写入数据库失败，改为逐条写入: {e}")
+                self._write_each(samples, algorithm_rows)
             finally:
-                conn.close()
+                for _ in batch:
+                    self._write_queue.task_done()
+    
+    def _write_batch(self, samples: List[Tuple[str, Dict[str, Any], float]], algorithm_rows: List[tuple]) -> int:
+        """在一个事务中写入传感器样本和算法结果，返回写入的传感器数值行数"""
+        # 元数据在加锁前序列化，缩短写锁持有时间
+        rows = [(*result[:7], _dumps(result[7])) for result in algorithm_rows]
+        with self._write_transaction() as conn:
+            row_count = self._insert_samples(conn, samples) if samples else 0
+            if rows:
+                conn.executemany(SQL_INSERT_ALGO, rows)
+        return row_count
+    
+    def _write_each(self, samples: List[Tuple[str, Dict[str, Any], float]], algorithm_rows: List[tuple]):
+        """批量写入失败后逐条写入，每条单独一个事务，记录并跳过出错的那一条"""
+        for sample in samples:
+            try:
+                self._write_batch([sample], [])
+            except Exception as e:
+                logger.error(f"存储传感器数据失败 ({sample[0]}): {e}")
+        
+        for result in algorithm_rows:
+            try:
+                self._write_batch([], [result])
+            except Exception as e:
+                logger.error(f"存储算法结果失败 ({result[1]}/{result[3]}): {e}")
+    
+    def flush(self):
+        """等待写入队列中的数据全部写入数据库"""
+        self._write_queue.join()
     
     def store_sensor_data(self, module: str, data: Dict[str, Any], timestamp: Optional[float] = None) -> bool:
-        """存储传感器数据"""
+        """存储传感器数据
+        
+        数据交给写入线程后立即返回；需要马上查询到时先调用 flush()。
+        """
         if timestamp is None:
             timestamp = time.time()
         
-        with self.lock:
-            conn = sqlite3.connect(self.db_path)
-            try:
-                # 存储原始JSON数据
-                raw_data_json = json.dumps(data)
-                conn.execute('''
-                    INSERT INTO sensor_data (timestamp, module, data_type, raw_data)
-                    VALUES (?, ?, ?, ?)
-                ''', (timestamp, module, 'raw', raw_data_json))
-                
-                # 分别存储各个数值字段
-                for key, value in data.items():
-                    if isinstance(value, (int, float)):
-                        conn.execute('''
-                            INSERT INTO sensor_data (timestamp, module, data_type, value, raw_data)
-                            VALUES (?, ?, ?, ?, ?)
-                        ''', (timestamp, module, key, float(value), raw_data_json))
-                
-                conn.commit()
-                logger.debug(f"存储传感器数据: {module} - {len(data)} 字段")
-                return True
-                
-            except Exception as e:
-                logger.error(f"存储传感器数据失败: {e}")
-                conn.rollback()
-                return False
-            finally:
-                conn.close()
+        return self._enqueue('sensor', [(module, data, timestamp)])
     
-    def store_algorithm_result(self, timestamp: float, algorithm_name: str, module: str, 
+    def store_sensor_data_bulk(self, samples: List[Tuple[str, Dict[str, Any], float]]) -> bool:
+        """批量存储传感器数据（所有样本在同一个事务中提交）
+        
+        samples 中每一项为 (module, data, timestamp)。
+        """
+        if not samples:
+            return True
+        
+        return self._enqueue('sensor', list(samples))
+    
+    def store_algorithm_result(self, timestamp: float, algorithm_name: str, module: str,
                              data_field: str, original_value: float, processed_value: float,
                              confidence: float, metadata: Dict[str, Any]) -> bool:
-        """存储算法处理结果"""
-        with self.lock:
-            conn = sqlite3.connect(self.db_path)
-            try:
-                metadata_json = json.dumps(metadata)
-                conn.execute('''
-                    INSERT INTO algorithm_results 
-                    (timestamp, algorithm_name, module, data_field, original_value, 
-                     processed_value, confidence, metadata)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (timestamp, algorithm_name, module, data_field, original_value,
-                      processed_value, confidence, metadata_json))
-                
-                conn.commit()
-                logger.debug(f"存储算法结果: {algorithm_name} - {module}.{data_field}")
-                return True
-                
-            except Exception as e:
-                logger.error(f"存储算法结果失败: {e}")
-                conn.rollback()
-                return False
-            finally:
-                conn.close()
+        """存储算法处理结果（交给写入线程，立即返回）"""
+        return self._enqueue('algorithm', [(timestamp, algorithm_name, module, data_field,
+                                            original_value, processed_value, confidence, metadata)])
+    
+    def store_algorithm_results_batch(self, results: List[Tuple[float, str, str, str, float, float, float, Dict[str, Any]]]) -> bool:
+        """批量存储算法处理结果（交给写入线程，立即返回）
+        
+        results 中每一项为 (timestamp, algorithm_name, module, data_field,
+        original_value, processed_value, confidence, metadata)。
+        """
+        if not results:
+            return True
+        
+        return self._enqueue('algorithm', list(results))
     
     def store_system_status(self, status_type: str, status_data: Dict[str, Any],
                           module: Optional[str] = None, timestamp: Optional[float] = None) -> bool:
@@ -162,277 +436,332 @@ class DatabaseManager:
         if timestamp is None:
             timestamp = time.time()
         
-        with self.lock:
-            conn = sqlite3.connect(self.db_path)
-            try:
-                status_json = json.dumps(status_data)
-                conn.execute('''
-                    INSERT INTO system_status (timestamp, status_type, module, status_data)
-                    VALUES (?, ?, ?, ?)
-                ''', (timestamp, status_type, module, status_json))
-                
-                conn.commit()
-                logger.debug(f"存储系统状态: {status_type}")
-                return True
-                
-            except Exception as e:
-                logger.error(f"存储系统状态失败: {e}")
-                conn.rollback()
-                return False
-            finally:
-                conn.close()
+        try:
+            status_json = _dumps(status_data)
+            with self._write_transaction() as conn:
+                conn.execute(SQL_INSERT_STATUS, (timestamp, status_type, module, status_json))
+            
+            logger.debug(f"存储系统状态: {status_type}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"存储系统状态失败: {e}")
+            return False
     
     def get_sensor_data(self, module: Optional[str] = None, data_type: Optional[str] = None,
                        start_time: Optional[float] = None, end_time: Optional[float] = None,
-                       limit: int = 1000) -> List[Dict[str, Any]]:
-        """查询传感器数据"""
-        with self.lock:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            try:
-                query = "SELECT * FROM sensor_data WHERE 1=1"
-                params = []
-                
-                if module:
-                    query += " AND module = ?"
-                    params.append(module)
-                
-                if data_type:
-                    query += " AND data_type = ?"
-                    params.append(data_type)
-                
-                if start_time:
-                    query += " AND timestamp >= ?"
-                    params.append(start_time)
-                
-                if end_time:
-                    query += " AND timestamp <= ?"
-                    params.append(end_time)
-                
-                query += " ORDER BY timestamp DESC LIMIT ?"
-                params.append(limit)
-                
-                cursor = conn.execute(query, params)
-                rows = cursor.fetchall()
-                
-                result = []
-                for row in rows:
-                    data = dict(row)
-                    if data['raw_data']:
-                        try:
-                            data['parsed_data'] = json.loads(data['raw_data'])
-                        except:
-                            data['parsed_data'] = None
-                    result.append(data)
-                
-                return result
-                
-            except Exception as e:
-                logger.error(f"查询传感器数据失败: {e}")
-                return []
-            finally:
-                conn.close()
+                       limit: int = 1000, include_raw: bool = False) -> List[Union[SensorRow, Dict[str, Any]]]:
+        """查询传感器数据
+        
+        默认返回 SensorRow 列表；include_raw=True 时关联 sensor_raw 表取回
+        每行对应的原始JSON，返回字典列表。
+        """
+        try:
+            conn = self._conn()
+            
+            # 只取调用方需要的列；原始JSON需要时才关联读取
+            if include_raw:
+                query = """
+                    SELECT sensor_data.timestamp, sensor_data.module, sensor_data.data_type, sensor_data.value,
+                           COALESCE(sensor_raw.raw_data, sensor_data.raw_data) AS raw_data
+                    FROM sensor_data LEFT JOIN sensor_raw ON sensor_raw.id = sensor_data.raw_id
+                    WHERE 1=1"""
+            else:
+                query = "SELECT timestamp, module, data_type, value FROM sensor_data WHERE 1=1"
+            params = []
+            
+            if module:
+                query += " AND sensor_data.module = ?"
+                params.append(module)
+            
+            if data_type:
+                query += " AND sensor_data.data_type = ?"
+                params.append(data_type)
+            
+            if start_time:
+                query += " AND sensor_data.timestamp >= ?"
+                params.append(start_time)
+            
+            if end_time:
+                query += " AND sensor_data.timestamp <= ?"
+                params.append(end_time)
+            
+            query += " ORDER BY sensor_data.timestamp DESC LIMIT ?"
+            params.append(limit)
+            
+            if not include_raw:
+                return list(map(SensorRow._make, conn.execute(query, params)))
+            
+            cursor = conn.cursor()
+            cursor.row_factory = sqlite3.Row
+            rows = cursor.execute(query, params).fetchall()
+            
+            result = []
+            for row in rows:
+                data = dict(row)
+                if data['raw_data']:
+                    try:
+                        data['parsed_data'] = _loads(data['raw_data'])
+                    except:
+                        data['parsed_data'] = None
+                result.append(data)
+            
+            return result
+            
+        except Exception as e:
+            logger.error(f"查询传感器数据失败: {e}")
+            return []
     
     def get_algorithm_results(self, algorithm_name: Optional[str] = None, module: Optional[str] = None,
                             start_time: Optional[float] = None, end_time: Optional[float] = None,
-                            limit: int = 1000) -> List[Dict[str, Any]]:
-        """查询算法结果"""
-        with self.lock:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            try:
-                query = "SELECT * FROM algorithm_results WHERE 1=1"
-                params = []
-                
-                if algorithm_name:
-                    query += " AND algorithm_name = ?"
-                    params.append(algorithm_name)
-                
-                if module:
-                    query += " AND module = ?"
-                    params.append(module)
-                
-                if start_time:
-                    query += " AND timestamp >= ?"
-                    params.append(start_time)
-                
-                if end_time:
-                    query += " AND timestamp <= ?"
-                    params.append(end_time)
-                
-                query += " ORDER BY timestamp DESC LIMIT ?"
-                params.append(limit)
-                
-                cursor = conn.execute(query, params)
-                rows = cursor.fetchall()
-                
-                result = []
-                for row in rows:
-                    data = dict(row)
-                    if data['metadata']:
-                        try:
-                            data['parsed_metadata'] = json.loads(data['metadata'])
-                        except:
-                            data['parsed_metadata'] = None
-                    result.append(data)
-                
-                return result
-                
-            except Exception as e:
-                logger.error(f"查询算法结果失败: {e}")
-                return []
-            finally:
-                conn.close()
+                            limit: int = 1000, include_metadata: bool = False) -> List[Union[AlgorithmRow, Dict[str, Any]]]:
+        """查询算法结果
+        
+        默认返回 AlgorithmRow 列表；include_metadata=True 时额外读取并解析
+        metadata JSON，返回字典列表。
+        """
+        try:
+            conn = self._conn()
+            
+            query = ("SELECT timestamp, algorithm_name, module, data_field, original_value, "
+                     "processed_value, confidence" + (", metadata" if include_metadata else "") +
+                     " FROM algorithm_results WHERE 1=1")
+            params = []
+            
+            if algorithm_name:
+                query += " AND algorithm_name = ?"
+                params.append(algorithm_name)
+            
+            if module:
+                query += " AND module = ?"
+                params.append(module)
+            
+            if start_time:
+                query += " AND timestamp >= ?"
+                params.append(start_time)
+            
+            if end_time:
+                query += " AND timestamp <= ?"
+                params.append(end_time)
+            
+            query += " ORDER BY timestamp DESC LIMIT ?"
+            params.append(limit)
+            
+            if not include_metadata:
+                return list(map(AlgorithmRow._make, conn.execute(query, params)))
+            
+            cursor = conn.cursor()
+            cursor.row_factory = sqlite3.Row
+            rows = cursor.execute(query, params).fetchall()
+            
+            result = []
+            for row in rows:
+                data = dict(row)
+                if data['metadata']:
+                    try:
+                        data['parsed_metadata'] = _loads(data['metadata'])
+                    except:
+                        data['parsed_metadata'] = None
+                result.append(data)
+            
+            return result
+            
+        except Exception as e:
+            logger.error(f"查询算法结果失败: {e}")
+            return []
     
-    def get_statistics(self, hours_back: int = 24) -> Dict[str, Any]:
-        """获取统计信息"""
+    def iter_statistics(self, hours_back: int = 24) -> Iterator[Tuple[str, Optional[str], Dict[str, Any]]]:
+        """逐块生成统计信息
+        
+        依次产出 ('sensor', 模块名, {数据类型: 统计})、('algorithm', 算法名, 统计)
+        和 ('summary', None, 总体统计)。WAL 模式下读操作不需要写锁，
+        调用方可以边查询边输出。查询失败时直接抛出异常。
+        """
         start_time = time.time() - (hours_back * 3600)
         
-        with self.lock:
-            conn = sqlite3.connect(self.db_path)
-            try:
-                stats = {}
-                
-                # 传感器数据统计
-                cursor = conn.execute('''
-                    SELECT module, data_type, COUNT(*) as count, 
-                           AVG(value) as avg_value, MIN(value) as min_value, MAX(value) as max_value
-                    FROM sensor_data 
-                    WHERE timestamp >= ? AND value IS NOT NULL
-                    GROUP BY module, data_type
-                ''', (start_time,))
-                
-                sensor_stats = {}
-                for row in cursor.fetchall():
-                    module = row[0]
-                    if module not in sensor_stats:
-                        sensor_stats[module] = {}
-                    sensor_stats[module][row[1]] = {
-                        'count': row[2],
-                        'avg': round(row[3], 2) if row[3] else None,
-                        'min': row[4],
-                        'max': row[5]
-                    }
-                stats['sensor_data'] = sensor_stats
-                
-                # 算法结果统计
-                cursor = conn.execute('''
-                    SELECT algorithm_name, COUNT(*) as count, AVG(confidence) as avg_confidence
-                    FROM algorithm_results 
-                    WHERE timestamp >= ?
-                    GROUP BY algorithm_name
-                ''', (start_time,))
-                
-                algorithm_stats = {}
-                for row in cursor.fetchall():
-                    algorithm_stats[row[0]] = {
-                        'count': row[1],
-                        'avg_confidence': round(row[2], 3) if row[2] else None
-                    }
-                stats['algorithm_results'] = algorithm_stats
-                
-                # 总体统计
-                cursor = conn.execute('SELECT COUNT(*) FROM sensor_data WHERE timestamp >= ?', (start_time,))
-                total_sensor_records = cursor.fetchone()[0]
-                
-                cursor = conn.execute('SELECT COUNT(*) FROM algorithm_results WHERE timestamp >= ?', (start_time,))
-                total_algorithm_records = cursor.fetchone()[0]
-                
-                stats['summary'] = {
-                    'hours_back': hours_back,
-                    'total_sensor_records': total_sensor_records,
-                    'total_algorithm_records': total_algorithm_records,
-                    'start_time': datetime.fromtimestamp(start_time).isoformat()
-                }
-                
-                return stats
-                
-            except Exception as e:
-                logger.error(f"获取统计信息失败: {e}")
-                return {}
-            finally:
-                conn.close()
+        conn = self._conn()
+        
+        # 传感器数据统计（读取分钟汇总表，按模块分组产出）；
+        # 起始分钟整分钟计入，时间窗口精度为一分钟
+        rows = conn.execute('''
+            SELECT module, data_type, SUM(count) as count,
+                   SUM(sum) / SUM(count) as avg_value, MIN(min) as min_value, MAX(max) as max_value
+            FROM sensor_stats_1m
+            WHERE minute_bin >= ?
+            GROUP BY module, data_type
+            ORDER BY module
+        ''', (int(start_time // 60),)).fetchall()
+        
+        total_sensor_records = 0
+        current_module = None
+        module_stats = {}
+        for row in rows:
+            total_sensor_records += row[2]
+            if row[0] != current_module:
+                if current_module is not None:
+                    yield ('sensor', current_module, module_stats)
+                current_module = row[0]
+                module_stats = {}
+            module_stats[row[1]] = {
+                'count': row[2],
+                'avg': round(row[3], 2) if row[3] else None,
+                'min': row[4],
+                'max': row[5]
+            }
+        if current_module is not None:
+            yield ('sensor', current_module, module_stats)
+        
+        # 算法结果统计
+        rows = conn.execute('''
+            SELECT algorithm_name, COUNT(*) as count, AVG(confidence) as avg_confidence
+            FROM algorithm_results 
+            WHERE timestamp >= ?
+            GROUP BY algorithm_name
+        ''', (start_time,)).fetchall()
+        
+        for row in rows:
+            yield ('algorithm', row[0], {
+                'count': row[1],
+                'avg_confidence': round(row[2], 3) if row[2] else None
+            })
+        
+        # 总体统计
+        total_algorithm_records = conn.execute(
+            'SELECT COUNT(*) FROM algorithm_results WHERE timestamp >= ?', (start_time,)).fetchone()[0]
+        
+        yield ('summary', None, {
+            'hours_back': hours_back,
+            'total_sensor_records': total_sensor_records,
+            'total_algorithm_records': total_algorithm_records,
+            'start_time': datetime.fromtimestamp(start_time).isoformat()
+        })
+    
+    def get_statistics(self, hours_back: int = 24) -> Dict[str, Any]:
+        """获取统计信息"""
+        try:
+            stats = {'sensor_data': {}, 'algorithm_results': {}}
+            for kind, name, block in self.iter_statistics(hours_back):
+                if kind == 'sensor':
+                    stats['sensor_data'][name] = block
+                elif kind == 'algorithm':
+                    stats['algorithm_results'][name] = block
+                else:
+                    stats['summary'] = block
+            return stats
+            
+        except Exception as e:
+            logger.error(f"获取统计信息失败: {e}")
+            return {}
+    
+    def _delete_in_chunks(self, table: str, cutoff_time: float) -> int:
+        """分批删除 table 中早于 cutoff_time 的行，每批一个短事务，返回删除总行数"""
+        query = (f'DELETE FROM {table} WHERE rowid IN '
+                 f'(SELECT rowid FROM {table} WHERE timestamp < ? LIMIT ?)')
+        total = 0
+        while True:
+            with self._write_transaction() as conn:
+                deleted = conn.execute(query, (cutoff_time, CLEANUP_CHUNK_SIZE)).rowcount
+            total += deleted
+            if deleted < CLEANUP_CHUNK_SIZE:
+                return total
+            # 两批之间让出写锁，写入线程可以插入排队的数据
+            time.sleep(CLEANUP_CHUNK_PAUSE)
     
     def cleanup_old_data(self, days_to_keep: int = 30) -> Dict[str, int]:
-        """清理旧数据"""
+        """清理旧数据
+        
+        各表按批删除，每批只短暂持有写锁，不阻塞实时写入。
+        """
         cutoff_time = time.time() - (days_to_keep * 24 * 3600)
         
-        with self.lock:
-            conn = sqlite3.connect(self.db_path)
-            try:
-                # 删除旧的传感器数据
-                cursor = conn.execute('DELETE FROM sensor_data WHERE timestamp < ?', (cutoff_time,))
-                sensor_deleted = cursor.rowcount
-                
-                # 删除旧的算法结果
-                cursor = conn.execute('DELETE FROM algorithm_results WHERE timestamp < ?', (cutoff_time,))
-                algorithm_deleted = cursor.rowcount
-                
-                # 删除旧的系统状态
-                cursor = conn.execute('DELETE FROM system_status WHERE timestamp < ?', (cutoff_time,))
-                status_deleted = cursor.rowcount
-                
-                # 优化数据库
-                conn.execute('VACUUM')
-                
-                conn.commit()
-                
-                result = {
-                    'sensor_data_deleted': sensor_deleted,
-                    'algorithm_results_deleted': algorithm_deleted,
-                    'system_status_deleted': status_deleted,
-                    'days_kept': days_to_keep
-                }
-                
-                logger.info(f"数据清理完成: {result}")
-                return result
-                
-            except Exception as e:
-                logger.error(f"数据清理失败: {e}")
-                conn.rollback()
-                return {}
-            finally:
-                conn.close()
+        try:
+            # 删除旧的传感器数据（先删数值行，再删其引用的原始JSON）
+            sensor_deleted = self._delete_in_chunks('sensor_data', cutoff_time)
+            raw_deleted = self._delete_in_chunks('sensor_raw', cutoff_time)
+            
+            # 删除旧的算法结果
+            algorithm_deleted = self._delete_in_chunks('algorithm_results', cutoff_time)
+            
+            # 删除旧的系统状态
+            status_deleted = self._delete_in_chunks('system_status', cutoff_time)
+            
+            # 分钟汇总表每分钟每个字段只有一行，直接删除
+            with self._write_transaction() as conn:
+                conn.execute('DELETE FROM sensor_stats_1m WHERE minute_bin < ?', (int(cutoff_time // 60),))
+            
+            vacuumed = False
+            with self.lock:
+                conn = self._conn()
+                # 归还空闲页（不能在事务中执行），每天最多一次
+                now = time.time()
+                if conn.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+                    # 旧版本创建的库：由这次手动清理执行一次整库 VACUUM，同时切换为增量回收模式
+                    logger.info("切换数据库为增量回收模式，执行一次 VACUUM")
+                    conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+                    conn.execute('VACUUM')
+                    self._last_vacuum = now
+                    vacuumed = True
+                elif now - self._last_vacuum >= _INCREMENTAL_VACUUM_INTERVAL:
+                    # executescript 会把语句执行到底；execute 只推进一步，只回收一页
+                    conn.executescript('PRAGMA incremental_vacuum;')
+                    self._last_vacuum = now
+                    vacuumed = True
+                
+                # 把清理产生的 WAL 内容写回数据库并截断 WAL 文件
+                conn.execute('PRAGMA wal_checkpoint(TRUNCATE)').fetchone()
+            
+            result = {
+                'sensor_data_deleted': sensor_deleted,
+                'sensor_raw_deleted': raw_deleted,
+                'algorithm_results_deleted': algorithm_deleted,
+                'system_status_deleted': status_deleted,
+                'days_kept': days_to_keep,
+                'vacuumed': vacuumed
+            }
+            
+            logger.info(f"数据清理完成: {result}")
+            return result
+            
+        except Exception as e:
+            logger.error(f"数据清理失败: {e}")
+            return {}
     
     def get_database_info(self) -> Dict[str, Any]:
         """获取数据库信息"""
-        with self.lock:
-            conn = sqlite3.connect(self.db_path)
-            try:
-                info = {
-                    'database_path': self.db_path,
-                    'file_size_mb': Path(self.db_path).stat().st_size / (1024 * 1024) if Path(self.db_path).exists() else 0
+        try:
+            conn = self._conn()
+            info = {
+                'database_path': self.db_path,
+                'file_size_mb': Path(self.db_path).stat().st_size / (1024 * 1024) if Path(self.db_path).exists() else 0
+            }
+            
+            # 表记录数和时间范围一次查询取回；MIN/MAX 分开写成子查询，
+            # 各自走时间索引的首尾，不扫描整表
+            row = conn.execute('''
+                SELECT (SELECT COUNT(*) FROM sensor_data),
+                       (SELECT COUNT(*) FROM algorithm_results),
+                       (SELECT COUNT(*) FROM system_status),
+                       (SELECT MIN(timestamp) FROM sensor_data),
+                       (SELECT MAX(timestamp) FROM sensor_data)
+            ''').fetchone()
+            info['sensor_data_count'], info['algorithm_results_count'], info['system_status_count'] = row[:3]
+            
+            # 获取时间范围
+            start, end = row[3:]
+            if start and end:
+                info['data_time_range'] = {
+                    'start': datetime.fromtimestamp(start).isoformat(),
+                    'end': datetime.fromtimestamp(end).isoformat()
                 }
-                
-                # 获取表记录数
-                tables = ['sensor_data', 'algorithm_results', 'system_status']
-                for table in tables:
-                    cursor = conn.execute(f'SELECT COUNT(*) FROM {table}')
-                    info[f'{table}_count'] = cursor.fetchone()[0]
-                
-                # 获取时间范围
-                cursor = conn.execute('SELECT MIN(timestamp), MAX(timestamp) FROM sensor_data')
-                row = cursor.fetchone()
-                if row[0] and row[1]:
-                    info['data_time_range'] = {
-                        'start': datetime.fromtimestamp(row[0]).isoformat(),
-                        'end': datetime.fromtimestamp(row[1]).isoformat()
-                    }
-                
-                return info
-                
-            except Exception as e:
-                logger.error(f"获取数据库信息失败: {e}")
-                return {}
-            finally:
-                conn.close()
+            
+            return info
+            
+        except Exception as e:
+            logger.error(f"获取数据库信息失败: {e}")
+            return {}
 
 # 全局数据库管理器实例
-_database_manager = None
-
+@cache
 def get_database_manager() -> DatabaseManager:
-    """获取全局数据库管理器实例"""
-    global _database_manager
-    if _database_manager is None:
-        _database_manager = DatabaseManager()
-    return _database_manager 
\ No newline at end of file
+    """获取全局数据库管理器实例（首次调用时创建）"""
+    return DatabaseManager()
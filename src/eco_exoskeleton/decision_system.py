@@ -1,11 +1,21 @@
 import time
 import logging
-from typing import Dict, List, Optional
+from collections import deque
+from typing import Deque, Dict, List, Optional
 from eco_exoskeleton.models import SensorData, ModuleStatus, Command, ModuleState
-from eco_exoskeleton.config import DECISION_INTERVAL
+from eco_exoskeleton.config import DECISION_INTERVAL, MODULES
 
 logger = logging.getLogger(__name__)
 
+# 模块名 -> 状态列表下标
+_MODULE_INDEX = {module: index for index, module in enumerate(MODULES)}
+_GREENHOUSE = _MODULE_INDEX["greenhouse"]
+_INJECTION = _MODULE_INDEX["injection"]
+
+# 修复计划中注射和喷洒命令的固定参数，生成命令时再合并位置
+_REPAIR_INJECT_PARAMS = {"depth": 15, "pressure": 200}
+_REPAIR_SPRAY_PARAMS = {"duration": 3000, "intensity": 80}
+
 class CentralDecisionSystem:
     def __init__(self):
         self.environment = SensorData()
@@ -14,51 +24,59 @@ class CentralDecisionSystem:
             "injection": ModuleStatus("injection", ModuleState.IDLE, "初始化", time.time()),
             "bubble": ModuleStatus("bubble", ModuleState.IDLE, "初始化", time.time())
         }
-        self.repair_plan: List[Command] = []
-        self.last_decision_time = time.time()
+        # 各模块当前状态，按 _MODULE_INDEX 下标存放，供决策循环直接索引；
+        # module_states 保留给外部查询，两者同步更新
+        self._states: List[ModuleState] = [ModuleState.IDLE] * len(MODULES)
+        self.repair_plan: Deque[Command] = deque()
+        # 决策间隔用单调时钟计时，不受系统时间调整影响
+        self.last_decision_time = time.monotonic()
         
     def update_sensor_data(self, sensor_data: SensorData):
         self.environment = sensor_data
-        if not self.repair_plan and self.environment.damage_areas:
+        # damage_areas 可能是 numpy 数组，不能直接做真值判断
+        if not self.repair_plan and len(self.environment.damage_areas):
             self._generate_repair_plan()
     
     def update_module_status(self, status: ModuleStatus):
         self.module_states[status.module] = status
+        index = _MODULE_INDEX.get(status.module)
+        if index is not None:
+            self._states[index] = status.state
         if status.state == ModuleState.COMPLETED:
             self._handle_task_completion(status.module)
         elif status.state == ModuleState.ERROR:
             self._handle_module_error(status.module)
     
     def make_decision(self) -> Optional[Command]:
-        current_time = time.time()
+        current_time = time.monotonic()
         if current_time - self.last_decision_time < DECISION_INTERVAL:
             return None
 
         self.last_decision_time = current_time
 
         if self.repair_plan:
-            return self.repair_plan.pop(0)
+            return self.repair_plan.popleft()
 
         return self._monitor_environment()
     
     def _generate_repair_plan(self):
-        if not self.environment.damage_areas:
+        areas = self.environment.damage_areas
+        if not len(areas):
             return
+        # numpy 数组一次性转换成 Python 列表，命令参数可直接序列化为 JSON
+        if hasattr(areas, "tolist"):
+            areas = areas.tolist()
             
-        self.repair_plan = [
-            Command("greenhouse", "deploy", {"location": self.environment.damage_areas[0]}),
-            Command("injection", "inject", {
-                "depth": 15, 
-                "pressure": 200,
-                "location": self.environment.damage_areas[0]
-            }),
-            Command("bubble", "spray", {
-                "duration": 3000,
-                "intensity": 80,
-                "location": self.environment.damage_areas[0]
-            }),
-            Command("greenhouse", "retract", {})
-        ]
+        # 每个受损区域依次执行：展开温室 -> 注射 -> 喷洒 -> 收回温室
+        plan = deque()
+        for location in areas:
+            plan.extend((
+                Command("greenhouse", "deploy", {"location": location}),
+                Command("injection", "inject", {**_REPAIR_INJECT_PARAMS, "location": location}),
+                Command("bubble", "spray", {**_REPAIR_SPRAY_PARAMS, "location": location}),
+                Command("greenhouse", "retract", {})
+            ))
+        self.repair_plan = plan
     
     def _handle_task_completion(self, module: str):
         logger.info(f"{module} 模块任务完成，继续执行后续计划")
@@ -77,10 +95,10 @@ class CentralDecisionSystem:
         return None
     
     def _monitor_environment(self) -> Optional[Command]:
-        if self.environment.temperature < 10 and self.module_states["greenhouse"].state == ModuleState.IDLE:
+        if self.environment.temperature < 10 and self._states[_GREENHOUSE] is ModuleState.IDLE:
             return Command("greenhouse", "deploy", {})
             
-        if self.environment.soil_moisture < 30 and self.module_states["injection"].state == ModuleState.IDLE:
+        if self.environment.soil_moisture < 30 and self._states[_INJECTION] is ModuleState.IDLE:
             return Command("injection", "inject", {"depth": 10, "pressure": 150})
         
         return None
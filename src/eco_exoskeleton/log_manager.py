@@ -1,26 +1,49 @@
+import atexit
 import logging
 import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from typing import Optional, List
 
 def setup_logging(log_file: Optional[str] = None, level: int = logging.INFO):
     """
     Initialize the logging system, supporting both console and optional file output.
+    Records are only enqueued on the calling thread; a background QueueListener
+    formats them and writes to the console/file, so MQTT and control threads never
+    block on disk I/O.
     :param log_file: Path to the log file. If None, output is only to the console.
     :param level: Logging level.
     """
+    # Same as logging.basicConfig: do nothing if the root logger is already configured
+    if logging.root.handlers:
+        return
+
     log_format = '[%(asctime)s] %(levelname)s [%(name)s]: %(message)s'
     datefmt = '%Y-%m-%d %H:%M:%S'
     handlers: List[logging.Handler] = [logging.StreamHandler()]
-    
+
     if log_file:
         log_dir = os.path.dirname(log_file)
         if log_dir:
             os.makedirs(log_dir, exist_ok=True)
         handlers.append(logging.FileHandler(log_file, encoding='utf-8'))
-    
+
+    formatter = logging.Formatter(log_format, datefmt)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+    queue_handler = QueueHandler(log_queue)
+    # QueueHandler only merges args/traceback into the message; the listener's
+    # handlers apply the real format
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))
+
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    # Flush queued records on interpreter exit
+    atexit.register(listener.stop)
+
     logging.basicConfig(
         level=level,
-        format=log_format,
-        datefmt=datefmt,
-        handlers=handlers
-    ) 
\ No newline at end of file
+        handlers=[queue_handler]
+    )
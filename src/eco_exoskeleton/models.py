@@ -11,18 +11,34 @@ class ModuleState(Enum):
     ERROR = "ERROR"
     COMPLETED = "COMPLETED"
 
-@dataclass
+@dataclass(slots=True)
 class SensorData:
     temperature: float = 25.0
     humidity: float = 50.0
     soil_moisture: float = 0.0
     wind_speed: float = 0.0
     terrain_type: str = "unknown"
+    # (x, y) 坐标序列；也可以是形状为 (N, 2) 的 numpy 数组
     damage_areas: List[Tuple[float, float]] = field(default_factory=list)
     injection_depth: float = 0.0
     bubble_flow: float = 0.0
 
-@dataclass
+# 各模块传感器主题的最新读数，由 MQTT 回调整体替换，读取时再合并成 SensorData
+@dataclass(slots=True, frozen=True)
+class GreenhouseReading:
+    temperature: float = 25.0
+    humidity: float = 50.0
+
+@dataclass(slots=True, frozen=True)
+class InjectionReading:
+    soil_moisture: float = 0.0
+    injection_depth: float = 0.0
+
+@dataclass(slots=True, frozen=True)
+class BubbleReading:
+    bubble_flow: float = 0.0
+
+@dataclass(slots=True)
 class ModuleStatus:
     module: str
     state: ModuleState
@@ -30,7 +46,7 @@ class ModuleStatus:
     timestamp: float
     data: dict = field(default_factory=dict)
 
-@dataclass
+@dataclass(slots=True)
 class Command:
     module: str
     action: str
@@ -1,18 +1,62 @@
 import json
 import logging
+from collections import deque
 import paho.mqtt.client as mqtt
-from eco_exoskeleton.models import SensorData, ModuleStatus, Command, ModuleState
+from eco_exoskeleton.models import (
+    SensorData, ModuleStatus, Command, ModuleState,
+    GreenhouseReading, InjectionReading, BubbleReading
+)
 from eco_exoskeleton.config import *
 
+# orjson 可直接解析 bytes 负载，并直接编码为 bytes 交给 paho 发布；
+# 未安装时标准库 json.loads 同样接受 bytes，编码结果手动转成 UTF-8 bytes
+try:
+    from orjson import dumps as _dumps, loads as _loads
+except ImportError:
+    from json import loads as _loads
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+
 logger = logging.getLogger(__name__)
 
+# 模块名 -> 命令主题
+_COMMAND_TOPICS = {module: topics["command"] for module, topics in TOPICS.items()}
+
+# 状态值 -> ModuleState，避免每条状态消息都走 Enum 按值构造的元类逻辑
+_STATES = {state.value: state for state in ModuleState}
+
+# 待控制循环处理的模块状态消息上限；控制循环停顿时丢弃最旧的状态
+STATUS_INBOX_SIZE = 1000
+
 class MQTTManager:
     def __init__(self, decision_system):
         self.decision_system = decision_system
         self.client = mqtt.Client()
-        self.sensor_data = SensorData()
+        # 每个模块一份只读读数，回调只替换自己模块的引用，互不覆盖
+        self._greenhouse = GreenhouseReading()
+        self._injection = InjectionReading()
+        self._bubble = BubbleReading()
+        # 收到传感器消息后置位，由控制循环通过 drain_sensor_update 统一推送给决策系统
+        self._sensor_dirty = False
+        # 网络线程解析好的模块状态，由控制循环通过 drain_status_updates 取出处理；
+        # 单生产者单消费者，deque 的 append/popleft 在 GIL 下是原子操作，无需加锁
+        self._status_inbox = deque(maxlen=STATUS_INBOX_SIZE)
         self.connected = False
         
+        # 主题 -> 处理方法
+        self._handlers = {
+            TOPIC_GREENHOUSE_SENSORS: self._process_greenhouse_sensors,
+            TOPIC_GREENHOUSE_STATUS: self._process_greenhouse_status,
+            TOPIC_INJECTION_SENSORS: self._process_injection_sensors,
+            TOPIC_INJECTION_STATUS: self._process_injection_status,
+            TOPIC_BUBBLE_SENSORS: self._process_bubble_sensors,
+            TOPIC_BUBBLE_STATUS: self._process_bubble_status
+        }
+        
+        # 急停命令内容固定，启动时编码一次，急停时直接发布
+        self._emergency_payload = _dumps({"action": "emergency_stop", "params": {}})
+        
         self.client.on_connect = self._on_connect
         self.client.on_message = self._on_message
         self.client.username_pw_set(MQTT_USER, MQTT_PASS)
@@ -29,65 +73,50 @@ class MQTTManager:
     
     def _on_connect(self, client, userdata, flags, rc):
         if rc == 0:
-            client.subscribe([
-                (TOPIC_GREENHOUSE_SENSORS, 0),
-                (TOPIC_GREENHOUSE_STATUS, 0),
-                (TOPIC_INJECTION_SENSORS, 0),
-                (TOPIC_INJECTION_STATUS, 0),
-                (TOPIC_BUBBLE_SENSORS, 0),
-                (TOPIC_BUBBLE_STATUS, 0)
-            ])
+            client.subscribe([(topic, SENSOR_QOS) for topic in self._handlers])
             self.connected = True
         else:
             logger.error(f"连接失败，错误码: {rc}")
     
     def _on_message(self, client, userdata, msg):
         try:
-            payload = msg.payload.decode("utf-8")
-            data = json.loads(payload)
-            
-            if msg.topic == TOPIC_GREENHOUSE_SENSORS:
-                self._process_greenhouse_sensors(data)
-            elif msg.topic == TOPIC_GREENHOUSE_STATUS:
-                self._process_greenhouse_status(data)
-            elif msg.topic == TOPIC_INJECTION_SENSORS:
-                self._process_injection_sensors(data)
-            elif msg.topic == TOPIC_INJECTION_STATUS:
-                self._process_injection_status(data)
-            elif msg.topic == TOPIC_BUBBLE_SENSORS:
-                self._process_bubble_sensors(data)
-            elif msg.topic == TOPIC_BUBBLE_STATUS:
-                self._process_bubble_status(data)
+            handler = self._handlers.get(msg.topic)
+            if handler is not None:
+                handler(_loads(msg.payload))
                 
         except Exception as e:
             logger.error("消息处理错误", exc_info=e)
     
     def _process_greenhouse_sensors(self, data: dict):
-        self.sensor_data.temperature = data.get("temperature", 25.0)
-        self.sensor_data.humidity = data.get("humidity", 50.0)
-        self.decision_system.update_sensor_data(self.sensor_data)
+        self._greenhouse = GreenhouseReading(
+            temperature=data.get("temperature", 25.0),
+            humidity=data.get("humidity", 50.0)
+        )
+        self._sensor_dirty = True
     
     def _process_greenhouse_status(self, data: dict):
         state_value = data["state"]
         if not isinstance(state_value, ModuleState):
-            state_value = ModuleState(state_value)
+            state_value = _STATES[state_value]
         status = ModuleStatus(
             module="greenhouse",
             state=state_value,
             message=data["message"],
             timestamp=data["timestamp"]
         )
-        self.decision_system.update_module_status(status)
+        self._status_inbox.append(status)
     
     def _process_injection_sensors(self, data: dict):
-        self.sensor_data.soil_moisture = data.get("soil_moisture", 0.0)
-        self.sensor_data.injection_depth = data.get("current_depth", 0.0)
-        self.decision_system.update_sensor_data(self.sensor_data)
+        self._injection = InjectionReading(
+            soil_moisture=data.get("soil_moisture", 0.0),
+            injection_depth=data.get("current_depth", 0.0)
+        )
+        self._sensor_dirty = True
     
     def _process_injection_status(self, data: dict):
         state_value = data["state"]
         if not isinstance(state_value, ModuleState):
-            state_value = ModuleState(state_value)
+            state_value = _STATES[state_value]
         status = ModuleStatus(
             module="injection",
             state=state_value,
@@ -95,16 +124,16 @@ class MQTTManager:
             timestamp=data["timestamp"],
             data={"depth": data.get("depth", 0), "pressure": data.get("pressure", 0)}
         )
-        self.decision_system.update_module_status(status)
+        self._status_inbox.append(status)
     
     def _process_bubble_sensors(self, data: dict):
-        self.sensor_data.bubble_flow = data.get("flow_rate", 0.0)
-        self.decision_system.update_sensor_data(self.sensor_data)
+        self._bubble = BubbleReading(bubble_flow=data.get("flow_rate", 0.0))
+        self._sensor_dirty = True
     
     def _process_bubble_status(self, data: dict):
         state_value = data["state"]
         if not isinstance(state_value, ModuleState):
-            state_value = ModuleState(state_value)
+            state_value = _STATES[state_value]
         status = ModuleStatus(
             module="bubble",
             state=state_value,
@@ -112,28 +141,79 @@ class MQTTManager:
             timestamp=data["timestamp"],
             data={"duration": data.get("duration", 0), "intensity": data.get("intensity", 0)}
         )
-        self.decision_system.update_module_status(status)
+        self._status_inbox.append(status)
+    
+    def drain_status_updates(self) -> int:
+        """按到达顺序把收到的模块状态交给决策系统，返回处理的条数"""
+        inbox = self._status_inbox
+        update_module_status = self.decision_system.update_module_status
+        count = 0
+        while inbox:
+            update_module_status(inbox.popleft())
+            count += 1
+        return count
+    
+    def drain_sensor_update(self) -> bool:
+        """若自上次调用后收到过传感器数据，则把最新数据推送给决策系统"""
+        if not self._sensor_dirty:
+            return False
+        self._sensor_dirty = False
+        self.decision_system.update_sensor_data(self.snapshot())
+        return True
+    
+    def snapshot(self) -> SensorData:
+        """合并各模块最新读数，生成一份新的 SensorData"""
+        greenhouse, injection, bubble = self._greenhouse, self._injection, self._bubble
+        return SensorData(
+            temperature=greenhouse.temperature,
+            humidity=greenhouse.humidity,
+            soil_moisture=injection.soil_moisture,
+            injection_depth=injection.injection_depth,
+            bubble_flow=bubble.bubble_flow
+        )
+    
+    @property
+    def sensor_data(self) -> SensorData:
+        """当前传感器数据（只读）
+        
+        以前是可直接修改的属性，现在各模块读数分别保存，每次访问都调用 snapshot()
+        生成一份新的 SensorData。修改返回对象的字段不会影响管理器；
+        需要多次读取时请保存一次 snapshot() 的结果。
+        """
+        return self.snapshot()
+    
+    @sensor_data.setter
+    def sensor_data(self, value: SensorData):
+        raise AttributeError("sensor_data 为只读快照，传感器读数只能由 MQTT 消息更新")
     
     def send_command(self, command: Command) -> bool:
         if not self.connected:
             return False
             
-        topic = ""
-        if command.module == "greenhouse":
-            topic = TOPIC_GREENHOUSE_COMMAND
-        elif command.module == "injection":
-            topic = TOPIC_INJECTION_COMMAND
-        elif command.module == "bubble":
-            topic = TOPIC_BUBBLE_COMMAND
-        else:
+        topic = _COMMAND_TOPICS.get(command.module)
+        if topic is None:
             return False
             
-        payload = json.dumps({
+        payload = _dumps({
             "action": command.action,
             "params": command.params
         })
         
-        self.client.publish(topic, payload)
+        self.client.publish(topic, payload, qos=COMMAND_QOS)
+        return True
+
+    def publish_emergency_all(self) -> bool:
+        """向所有模块连续发布急停命令
+
+        复用已建立的连接，所有模块共用同一份编码好的负载；
+        publish 只把报文放入发送队列，三条报文由网络线程一并写出。
+        """
+        if not self.connected:
+            return False
+        publish = self.client.publish
+        payload = self._emergency_payload
+        for topic in _COMMAND_TOPICS.values():
+            publish(topic, payload, qos=COMMAND_QOS)
         return True
 
     def disconnect(self):
@@ -6,29 +6,39 @@
 为数据处理算法提供统一的数据接口。
 """
 
-import json
 import time
 import logging
 import threading
 from collections import deque, defaultdict
-from typing import Dict, List, Optional, Callable, Any
+from typing import Dict, List, Optional, Callable, Any, Iterable, Tuple
 import paho.mqtt.client as mqtt
-from eco_exoskeleton.config import (
-    MQTT_BROKER, MQTT_PORT, MQTT_USER, MQTT_PASS,
-    TOPIC_GREENHOUSE_SENSORS, TOPIC_INJECTION_SENSORS, TOPIC_BUBBLE_SENSORS
-)
+from eco_exoskeleton.config import MQTT_BROKER, MQTT_PORT, MQTT_USER, MQTT_PASS, TOPICS, SENSOR_QOS
 from eco_exoskeleton.database_manager import get_database_manager
 
+# MQTT 负载直接按 bytes 解析，安装了 orjson 时优先使用
+try:
+    from orjson import loads as _loads
+except ImportError:
+    from json import loads as _loads
+
 logger = logging.getLogger(__name__)
 
 class SensorDataBuffer:
-    """传感器数据缓冲区"""
+    """传感器数据缓冲区
+    
+    写入和读取最新一条不加锁：deque.append 与 deque[-1] 在 GIL 下是原子操作。
+    lock 只用于新建模块缓冲区和需要遍历缓冲区的快照读取。
+    """
     
     def __init__(self, max_size: int = 1000):
         self.max_size = max_size
         self.data_buffer = deque(maxlen=max_size)
         self.module_buffers = defaultdict(lambda: deque(maxlen=max_size))
         self.lock = threading.Lock()
+        # 每次写入递增的版本号（None 对应全部数据），用于判断历史快照是否过期
+        self._epochs: Dict[Optional[str], int] = {None: 0}
+        # (模块, 条数) -> (版本号, 快照)
+        self._snapshot_cache: Dict[Tuple[Optional[str], int], Tuple[int, List[dict]]] = {}
     
     def add_sensor_data(self, module: str, data: dict, timestamp: Optional[float] = None):
         """添加传感器数据"""
@@ -41,34 +51,63 @@ class SensorDataBuffer:
             'data': data
         }
         
-        with self.lock:
-            self.data_buffer.append(data_entry)
-            self.module_buffers[module].append(data_entry)
+        buffer = self.module_buffers.get(module)
+        if buffer is None:
+            # 新模块的缓冲区在锁内创建，避免遍历 module_buffers 时字典大小改变
+            with self.lock:
+                buffer = self.module_buffers[module]
+                self._epochs.setdefault(module, 0)
+        
+        self.data_buffer.append(data_entry)
+        buffer.append(data_entry)
+        self._epochs[module] += 1
+        self._epochs[None] += 1
     
     def get_latest_data(self, module: Optional[str] = None) -> Optional[dict]:
         """获取最新数据"""
-        with self.lock:
-            if module:
-                if self.module_buffers[module]:
-                    return self.module_buffers[module][-1]
-            else:
-                if self.data_buffer:
-                    return self.data_buffer[-1]
+        buffer = self.module_buffers.get(module) if module else self.data_buffer
+        # 缓冲区只会增长到 max_size 后滚动，非空后不会再变空
+        if buffer:
+            return buffer[-1]
         return None
     
+    def get_latest_data_bulk(self, modules: Iterable[str]) -> Dict[str, Optional[dict]]:
+        """批量获取多个模块的最新数据"""
+        latest = {}
+        for module in modules:
+            buffer = self.module_buffers.get(module)
+            latest[module] = buffer[-1] if buffer else None
+        return latest
+    
     def get_historical_data(self, module: Optional[str] = None, count: int = 100) -> List[dict]:
-        """获取历史数据"""
+        """获取历史数据
+        
+        没有新数据写入时直接返回上次的快照；返回的列表会被后续调用共享，调用方不应修改。
+        """
+        module = module or None
+        key = (module, count)
         with self.lock:
-            if module:
-                return list(self.module_buffers[module])[-count:]
-            else:
-                return list(self.data_buffer)[-count:]
+            # 先读版本号再复制：复制期间有新写入时快照只会比版本号新，下次调用会重新生成
+            epoch = self._epochs.get(module, 0)
+            cached = self._snapshot_cache.get(key)
+            if cached is not None and cached[0] == epoch:
+                return cached[1]
+            
+            source = self.module_buffers.get(module, ()) if module else self.data_buffer
+            snapshot = list(source)[-count:]
+            self._snapshot_cache[key] = (epoch, snapshot)
+            return snapshot
     
     def get_data_in_timerange(self, start_time: float, end_time: float, module: Optional[str] = None) -> List[dict]:
         """获取时间范围内的数据"""
         with self.lock:
-            source = self.module_buffers[module] if module else self.data_buffer
-            return [entry for entry in source 
+            source = self.module_buffers.get(module, ()) if module else self.data_buffer
+            # 时间范围与缓冲区完全不重叠时不必复制
+            if (not source or end_time < source[0]['timestamp']
+                    or start_time > source[-1]['timestamp']):
+                return []
+            # 写入不加锁，先整体复制（C 层一次完成）再过滤，避免遍历时 deque 被修改
+            return [entry for entry in list(source)
                    if start_time <= entry['timestamp'] <= end_time]
 
 class SensorCollector:
@@ -78,10 +117,15 @@ class SensorCollector:
         self.buffer = SensorDataBuffer(buffer_size)
         self.client = mqtt.Client(client_id="sensor_collector")
         self.connected = False
+        # 连接成功时由 _on_connect 置位，connect() 等待它而不是轮询 connected
+        self._connect_event = threading.Event()
         self.data_callbacks: List[Callable[[str, dict], None]] = []
         self.running = False
         self.enable_database = enable_database
         
+        # 传感器主题 -> 模块名称
+        self._topic_to_module = {topics['sensors']: module for module, topics in TOPICS.items()}
+        
         # 初始化数据库管理器
         if self.enable_database:
             self.db_manager = get_database_manager()
@@ -110,17 +154,13 @@ class SensorCollector:
     def connect(self) -> bool:
         """连接到MQTT服务器"""
         try:
+            self._connect_event.clear()
             self.client.connect(MQTT_BROKER, MQTT_PORT, 60)
             self.client.loop_start()
             self.running = True
             
             # 等待连接完成
-            timeout = 5.0
-            start_time = time.time()
-            while not self.connected and (time.time() - start_time) < timeout:
-                time.sleep(0.1)
-            
-            if self.connected:
+            if self._connect_event.wait(timeout=5.0):
                 logger.info("传感器收集器MQTT连接成功")
                 return True
             else:
@@ -143,29 +183,25 @@ class SensorCollector:
         """MQTT连接回调"""
         if rc == 0:
             self.connected = True
-            # 订阅所有传感器主题
-            sensor_topics = [
-                TOPIC_GREENHOUSE_SENSORS,
-                TOPIC_INJECTION_SENSORS,
-                TOPIC_BUBBLE_SENSORS
-            ]
-            
-            for topic in sensor_topics:
-                client.subscribe(topic)
+            # 订阅所有模块的传感器主题
+            for topic in self._topic_to_module:
+                client.subscribe(topic, qos=SENSOR_QOS)
                 logger.info(f"已订阅传感器主题: {topic}")
+            self._connect_event.set()
         else:
             logger.error(f"MQTT连接失败，错误码: {rc}")
     
     def _on_disconnect(self, client, userdata, rc):
         """MQTT断开连接回调"""
         self.connected = False
+        self._connect_event.clear()
         logger.warning("传感器收集器MQTT连接断开")
     
     def _on_message(self, client, userdata, msg):
         """MQTT消息回调"""
         try:
             topic = msg.topic
-            payload = json.loads(msg.payload.decode('utf-8'))
+            payload = _loads(msg.payload)
             timestamp = time.time()
             
             # 确定模块名称
@@ -195,19 +231,16 @@ class SensorCollector:
     
     def _extract_module_name(self, topic: str) -> str:
         """从MQTT主题提取模块名称"""
-        if "greenhouse" in topic:
-            return "greenhouse"
-        elif "injection" in topic:
-            return "injection"
-        elif "bubble" in topic:
-            return "bubble"
-        else:
-            return "unknown"
+        return self._topic_to_module.get(topic, "unknown")
     
     def get_latest_data(self, module: Optional[str] = None) -> Optional[dict]:
         """获取最新传感器数据"""
         return self.buffer.get_latest_data(module)
     
+    def get_latest_data_bulk(self, modules: Iterable[str]) -> Dict[str, Optional[dict]]:
+        """批量获取多个模块的最新传感器数据"""
+        return self.buffer.get_latest_data_bulk(modules)
+    
     def get_historical_data(self, module: Optional[str] = None, count: int = 100) -> List[dict]:
         """获取历史传感器数据"""
         return self.buffer.get_historical_data(module, count)
@@ -1,11 +1,10 @@
 import threading
-import time
 import logging
+import time
 from eco_exoskeleton.decision_system import CentralDecisionSystem
 from eco_exoskeleton.mqtt_manager import MQTTManager
 from eco_exoskeleton.sensor_collector import get_sensor_collector
 from eco_exoskeleton.algorithm_manager import get_algorithm_manager
-from eco_exoskeleton.models import Command
 from eco_exoskeleton.config import CONTROL_LOOP_FREQ
 
 """Ecological Exoskeleton System Controller
@@ -30,6 +29,8 @@ class EcologicalExoskeletonSystem:
         
         self.running = False
         self.control_thread = None
+        # 置位后控制循环立即退出，不必等完当前的休眠周期
+        self._stop_event = threading.Event()
         self.test_mode = test_mode
         self.test_sensor_gen = None
         
@@ -60,6 +61,7 @@ class EcologicalExoskeletonSystem:
         self._setup_default_pipelines()
         
         self.running = True
+        self._stop_event.clear()
         self.control_thread = threading.Thread(target=self._control_loop)
         self.control_thread.daemon = True
         self.control_thread.start()
@@ -111,9 +113,11 @@ class EcologicalExoskeletonSystem:
             
         logger.info("停止生态外骨骼系统...")
         self.running = False
+        self._stop_event.set()
         
-        # 停止控制循环
-        if self.control_thread and self.control_thread.is_alive():
+        # 停止控制循环（控制循环内部触发的紧急停止不能等待自身）
+        if (self.control_thread and self.control_thread.is_alive()
+                and self.control_thread is not threading.current_thread()):
             self.control_thread.join(timeout=5.0)
         
         # 停止算法管理器
@@ -128,26 +132,33 @@ class EcologicalExoskeletonSystem:
         logger.info("生态外骨骼系统已停止")
     
     def _control_loop(self):
-        while self.running:
+        interval = 1.0 / CONTROL_LOOP_FREQ
+        # 按固定节拍推进下一次执行时间，本轮处理耗时不会累积成周期漂移
+        next_tick = time.perf_counter()
+        while not self._stop_event.is_set():
             try:
+                # MQTT 回调只记录消息，状态和传感器数据在控制线程中交给决策系统
+                self.mqtt_manager.drain_status_updates()
+                self.mqtt_manager.drain_sensor_update()
                 command = self.decision_system.make_decision()
                 if command:
                     self.mqtt_manager.send_command(command)
-                time.sleep(1.0 / CONTROL_LOOP_FREQ)
+                
+                next_tick += interval
+                delay = next_tick - time.perf_counter()
+                if delay < 0:
+                    # 落后超过一个周期时不补跑，从当前时间重新对齐节拍
+                    next_tick = time.perf_counter()
+                    delay = 0
+                self._stop_event.wait(delay)
             except Exception as e:
                 logger.exception("控制循环错误")
                 self.emergency_stop()
-                time.sleep(1)
+                self._stop_event.wait(1)
+                next_tick = time.perf_counter()
     
     def emergency_stop(self):
-        commands = [
-            Command("greenhouse", "emergency_stop", {}),
-            Command("injection", "emergency_stop", {}),
-            Command("bubble", "emergency_stop", {})
-        ]
-        
-        for cmd in commands:
-            self.mqtt_manager.send_command(cmd)
+        self.mqtt_manager.publish_emergency_all()
         
         self.stop()
     
@@ -8,10 +8,17 @@ for testing purposes. Run this script standalone to simulate sensor input.
 import time
 import random
 from dataclasses import fields
+from typing import Iterator, Optional
+import numpy as np
 from eco_exoskeleton.decision_system import CentralDecisionSystem
 from eco_exoskeleton.models import SensorData
 from eco_exoskeleton.log_manager import setup_logging
 
+# Ranges of the scalar fields drawn by sensor_batch, in the order:
+# temperature, humidity, soil_moisture, wind_speed, injection_depth, bubble_flow
+_SCALAR_LOWS = (15, 40, 20, 0, 5, 10)
+_SCALAR_HIGHS = (30, 70, 60, 10, 20, 100)
+
 def generate_random_sensor_data() -> SensorData:
     """Generate random sensor data for testing."""
     return SensorData(
@@ -25,13 +32,72 @@ def generate_random_sensor_data() -> SensorData:
         bubble_flow=random.uniform(10, 100)
     )
 
+def update_inplace(sensor_data: SensorData, temperature: float, humidity: float,
+                   soil_moisture: float, wind_speed: float, terrain_type: str,
+                   damage_areas: np.ndarray, injection_depth: float,
+                   bubble_flow: float) -> SensorData:
+    """Overwrite every field of an existing SensorData."""
+    sensor_data.temperature = temperature
+    sensor_data.humidity = humidity
+    sensor_data.soil_moisture = soil_moisture
+    sensor_data.wind_speed = wind_speed
+    sensor_data.terrain_type = terrain_type
+    sensor_data.damage_areas = damage_areas
+    sensor_data.injection_depth = injection_depth
+    sensor_data.bubble_flow = bubble_flow
+    return sensor_data
+
+def sensor_batch(n: int = 1024, out: Optional[SensorData] = None) -> Iterator[SensorData]:
+    """Yield random sensor data, drawing the values n samples at a time with numpy.
+
+    Same ranges as generate_random_sensor_data, but all scalar fields of a batch
+    come from a single (n, 6) RNG draw instead of one call per value, for
+    high-rate stress testing.
+    If out is given, it is refilled in place and yielded every time instead of
+    allocating a new SensorData per sample; consumers must not keep references.
+    damage_areas is a (1, 2) float32 view into the batch's coordinate array.
+    """
+    rng = np.random.default_rng()
+    while True:
+        (temperature, humidity, soil_moisture, wind_speed,
+         injection_depth, bubble_flow) = rng.uniform(_SCALAR_LOWS, _SCALAR_HIGHS, (n, 6)).T.tolist()
+        columns = (
+            temperature,
+            humidity,
+            soil_moisture,
+            wind_speed,
+            rng.choice(["sand", "clay", "loam"], n).tolist(),
+            rng.uniform((50, 10), (55, 15), (n, 1, 2)).astype(np.float32),
+            injection_depth,
+            bubble_flow,
+        )
+        if out is not None:
+            for values in zip(*columns):
+                yield update_inplace(out, *values)
+            continue
+        for (temperature, humidity, soil_moisture, wind_speed, terrain_type,
+             damage_areas, injection_depth, bubble_flow) in zip(*columns):
+            yield SensorData(
+                temperature=temperature,
+                humidity=humidity,
+                soil_moisture=soil_moisture,
+                wind_speed=wind_speed,
+                terrain_type=terrain_type,
+                damage_areas=damage_areas,
+                injection_depth=injection_depth,
+                bubble_flow=bubble_flow
+            )
+
 if __name__ == "__main__":
     setup_logging(log_file="logs/test_sensor.log", level=20)
     decision_system = CentralDecisionSystem()
     print("Test sensor generator started. Press Ctrl+C to stop.")
+    # One SensorData is reused for every tick; the decision system only reads
+    # its current values and repair commands copy the damage locations out
+    batch_iter = sensor_batch(out=SensorData())
     try:
         while True:
-            sensor_data = generate_random_sensor_data()
+            sensor_data = next(batch_iter)
             decision_system.update_sensor_data(sensor_data)
             print("Generated sensor data:")
             for field in fields(sensor_data):
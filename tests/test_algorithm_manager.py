@@ -0,0 +1,50 @@
+"""AlgorithmManager 处理管道的回归测试"""
+
+from eco_exoskeleton.algorithm_manager import AlgorithmManager, ProcessingPipeline
+
+
+def _manager():
+    manager = AlgorithmManager(enable_database=False)
+    manager.create_pipeline(ProcessingPipeline("测试管道", ["温度滤波"], ["greenhouse"]))
+    return manager
+
+
+def test_field_processed_once_it_becomes_numeric():
+    """同一组字段中某字段首帧为 None，之后变为数值时仍会被处理"""
+    manager = _manager()
+
+    first = manager.process_pipeline("测试管道", "greenhouse", {"temperature": 25.0, "humidity": None})
+    second = manager.process_pipeline("测试管道", "greenhouse", {"temperature": 25.0, "humidity": 60.0})
+
+    assert set(first) == {"temperature"}
+    assert set(second) == {"temperature", "humidity"}
+
+
+def test_numeric_string_skipped_after_numeric_frame():
+    """字段首帧为数值、之后为数值字符串时跳过该字段，与逐帧类型检查一致"""
+    manager = _manager()
+
+    manager.process_pipeline("测试管道", "greenhouse", {"temperature": 25.0, "humidity": 60.0})
+    results = manager.process_pipeline("测试管道", "greenhouse", {"temperature": 25.0, "humidity": "25.3"})
+
+    assert set(results) == {"temperature"}
+
+
+def test_sensor_callback_runs_pipelines_in_order():
+    """共享算法实例的多个管道按注册顺序处理同一帧，结果与逐个调用 process_pipeline 一致"""
+    def build():
+        manager = AlgorithmManager(enable_database=False)
+        manager.create_pipeline(ProcessingPipeline("管道A", ["异常检测", "统计分析"], []))
+        manager.create_pipeline(ProcessingPipeline("管道B", ["异常检测", "统计分析"], []))
+        return manager
+
+    callback = build()
+    direct = build()
+    for i in range(60):
+        frame = {"temperature": 20.0 + (i % 9) * 0.7}
+        callback._on_sensor_data("greenhouse", frame)
+        direct.process_pipeline("管道A", "greenhouse", frame)
+        direct.process_pipeline("管道B", "greenhouse", frame)
+
+    for name in ("异常检测", "统计分析"):
+        assert callback.get_algorithm_results(name, 120) == direct.get_algorithm_results(name, 120)
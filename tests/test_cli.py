@@ -0,0 +1,71 @@
+"""SystemCLI 命令循环与查询缓存的回归测试"""
+
+import io
+
+import eco_exoskeleton.cli as cli
+
+
+class _FakeDatabase:
+    def flush(self):
+        pass
+
+
+class _FakeSystem:
+    def __init__(self):
+        self.running = False
+
+    def start(self):
+        self.running = True
+        return True
+
+    def stop(self):
+        self.running = False
+
+    def emergency_stop(self):
+        self.running = False
+
+    def get_system_status(self):
+        return {
+            'system_running': self.running,
+            'mqtt_connected': False,
+            'sensor_collector': {'connected': False, 'total_entries': 0, 'buffer_size': 0},
+            'algorithm_manager': {
+                'total_algorithms': 0, 'enabled_algorithms': 0,
+                'total_pipelines': 0, 'enabled_pipelines': 0,
+            },
+            'decision_system': {'module_states': {}, 'repair_plan_length': 0},
+        }
+
+
+def _status_lines(output):
+    return [line for line in output.splitlines() if '系统运行状态' in line]
+
+
+def test_status_not_stale_after_state_change(monkeypatch, capsys):
+    """start/stop/emergency 之后立即 status，显示的是新状态而不是缓存"""
+    monkeypatch.setattr(cli, 'get_database_manager', _FakeDatabase)
+    console = cli.SystemCLI(_FakeSystem())
+
+    for line in ('status', 'start', 'status', 'stop', 'status', 'start', 'emergency', 'status'):
+        console._dispatch(line)
+
+    states = _status_lines(capsys.readouterr().out)
+    assert len(states) == 4
+    assert ['运行中' in line for line in states] == [False, True, False, False]
+
+
+def test_piped_input_runs_commands_and_exits_on_eof(monkeypatch, capsys):
+    """非终端输入走输入线程循环：逐行执行命令，输入结束时按 exit 处理"""
+    monkeypatch.setattr(cli, 'get_database_manager', _FakeDatabase)
+    monkeypatch.setattr('sys.stdin', io.StringIO("start\nstatus\n"))
+    system = _FakeSystem()
+    console = cli.SystemCLI(system)
+
+    console.start()
+
+    output = capsys.readouterr().out
+    assert '系统启动成功' in output
+    assert ['运行中' in line for line in _status_lines(output)] == [True]
+    assert '退出系统' in output
+    assert console.running is False
+    assert system.running is False
@@ -0,0 +1,214 @@
+"""data_processing 中滑动窗口算法的回归测试"""
+
+import random
+import statistics
+from collections import deque
+
+import pytest
+
+import eco_exoskeleton.data_processing as data_processing
+from eco_exoskeleton.data_processing import (
+    AdaptiveFilter, DataFusionProcessor, KalmanFilter, MovingAverageFilter, OutlierDetector,
+    StatisticalAnalyzer, TrendAnalyzer, _RollingMedian
+)
+
+
+def test_outlier_constant_window_after_eviction():
+    """窗口在移出旧样本后变为全同数值时，不应被判为异常"""
+    detector = OutlierDetector(window_size=6, threshold_multiplier=2.0)
+    for value in [5, 5, 3, 1, 1, 1, 1, 1, 5, 1, 3, 1, 1, 1, 1, 1]:
+        detector.process(value)
+
+    result = detector.process(1)
+
+    assert result.metadata['is_outlier'] is False
+    assert result.metadata['std_dev'] == 0
+    assert result.confidence == 1.0
+    assert result.processed_value == 1
+
+
+def test_outlier_process_matches_process_batch_on_quantized_series():
+    """量化序列上逐个处理与批量处理的结果一致"""
+    values = [float(v) for v in [5, 5, 3, 1, 1, 1, 1, 1, 5, 1, 3, 1, 1, 1, 1, 1, 1] * 20]
+    single = OutlierDetector(window_size=6)
+    batch = OutlierDetector(window_size=6)
+
+    expected = [single.process(value).processed_value for value in values]
+
+    assert batch.process_batch(values) == expected
+
+
+def test_statistics_constant_window_after_eviction():
+    """窗口在移出旧样本后变为全同数值时，方差与标准差精确为 0"""
+    analyzer = StatisticalAnalyzer(window_size=6)
+    for value in [5, 5, 3, 1, 1, 1, 1, 1, 5, 1, 3, 1, 1, 1, 1, 1, 1]:
+        result = analyzer.process(value)
+
+    assert result['std_dev'] == 0
+    assert result['variance'] == 0
+    assert result['mean'] == 1
+
+
+def test_outlier_quiescent_result_reused_after_eviction():
+    """窗口移出旧样本后变为全同数值，重复到达的同一数值直接复用上一次结果"""
+    detector = OutlierDetector(window_size=6)
+    for value in [5, 5, 3, 1, 1, 1, 1, 1, 5, 1, 3, 1, 1, 1, 1, 1]:
+        detector.process(value)
+
+    first = detector.process(1)
+    second = detector.process(1)
+
+    assert second is first
+    assert first.metadata['z_score'] == 0
+    assert detector.process(9).metadata['is_outlier'] is True
+
+
+def test_kalman_process_batch_accepts_generator():
+    """process_batch 接受任意可迭代对象（包括生成器），结果与逐个处理一致"""
+    values = [20.0 + (i % 7) * 0.5 for i in range(50)]
+    single = KalmanFilter()
+    batch = KalmanFilter()
+
+    expected = [single.process(value).processed_value for value in values]
+    result = batch.process_batch(value for value in values)
+
+    assert result == expected
+
+
+def test_rolling_median_matches_statistics_median():
+    """含大量重复值的滑动窗口上，滚动中位数与 statistics.median 完全一致"""
+    rng = random.Random(0)
+    for window_size in (1, 2, 3, 4, 7, 20):
+        median = _RollingMedian()
+        window = deque()
+        for i in range(2000):
+            value = rng.choice([rng.randint(0, 5), float(rng.randint(-3, 3)), rng.random()])
+            if len(window) == window_size:
+                median.remove(window.popleft())
+            window.append(value)
+            median.add(value)
+            if i % 97 == 0:
+                median.reset(window)
+
+            assert median.median == statistics.median(window)
+
+
+def test_statistics_median_over_sliding_window():
+    """StatisticalAnalyzer 报告的中位数与对窗口排序求得的结果一致"""
+    rng = random.Random(1)
+    analyzer = StatisticalAnalyzer(window_size=10)
+    window = deque(maxlen=10)
+    for _ in range(500):
+        value = float(rng.randint(0, 4))
+        window.append(value)
+        assert analyzer.process(value)['median'] == statistics.median(window)
+
+
+def test_moving_average_recovers_after_bad_reading():
+    """inf 或极大尖峰移出窗口后，移动平均恢复正常（逐个、纯 Python 与批量三条路径）"""
+    for bad in (float('inf'), 1e16):
+        values = [1.0, 2.0, bad] + [1.0] * 10
+
+        single = MovingAverageFilter(window_size=3)
+        assert [single.process(v).processed_value for v in values][-3:] == [1.0, 1.0, 1.0]
+
+        scanned = MovingAverageFilter(window_size=3)
+        assert scanned._scan(values)[-3:] == [1.0, 1.0, 1.0]
+
+        batch = MovingAverageFilter(window_size=3)
+        assert batch.process_batch(values)[-3:] == [1.0, 1.0, 1.0]
+        assert batch.process_fast(1.0) == 1.0
+
+
+# 批量输入的切分方式：先逐个处理 2 个样本（窗口未满），再以跨越窗口边界的长度分段
+_CHUNK_SIZES = (1, 1, 3, 1, 4, 2, 57, 9, 123, 1, 98)
+
+
+def _random_series(seed, count=300):
+    """带偶发尖峰的随机序列"""
+    rng = random.Random(seed)
+    return [rng.gauss(20.0, 2.0) + (rng.choice((-25.0, 25.0)) if rng.random() < 0.05 else 0.0)
+            for _ in range(count)]
+
+
+def _run_in_chunks(process_batch, values):
+    results = []
+    start = 0
+    for size in _CHUNK_SIZES:
+        results.extend(process_batch(values[start:start + size]))
+        start += size
+    assert start == len(values)
+    return results
+
+
+@pytest.fixture(params=["numpy", "python"])
+def batch_backend(request, monkeypatch):
+    """分别检验 numpy 向量化路径与纯 Python 路径"""
+    if request.param == "python":
+        monkeypatch.setattr(data_processing, "np", None)
+    elif data_processing.np is None:
+        pytest.skip("numpy 未安装")
+    return request.param
+
+
+@pytest.mark.parametrize("window_size", [1, 3, 5, 20])
+def test_moving_average_batch_matches_process(batch_backend, window_size):
+    values = _random_series(10)
+    single = MovingAverageFilter(window_size)
+    batch = MovingAverageFilter(window_size)
+
+    expected = [single.process(v).processed_value for v in values]
+
+    assert _run_in_chunks(batch.process_batch, values) == pytest.approx(expected, rel=1e-12, abs=1e-12)
+
+
+@pytest.mark.parametrize("window_size", [3, 5, 20])
+def test_outlier_batch_matches_process(batch_backend, window_size):
+    values = _random_series(11)
+    single = OutlierDetector(window_size)
+    batch = OutlierDetector(window_size)
+
+    expected = [single.process(v).processed_value for v in values]
+
+    assert _run_in_chunks(batch.process_batch, values) == pytest.approx(expected, rel=1e-12, abs=1e-12)
+
+
+@pytest.mark.parametrize("window_size", [3, 4, 10])
+def test_trend_batch_matches_process(batch_backend, window_size):
+    values = _random_series(12)
+    single = TrendAnalyzer(window_size)
+    batch = TrendAnalyzer(window_size)
+
+    expected = []
+    for i, value in enumerate(values):
+        result = single.process(value, float(i))
+        expected.append(result.metadata['slope'] if 'sample_count' in result.metadata else 0.0)
+
+    assert _run_in_chunks(batch.process_batch, values) == pytest.approx(expected, rel=1e-9, abs=1e-9)
+
+
+def test_kalman_and_adaptive_batch_match_process():
+    values = _random_series(13)
+    for make in (KalmanFilter, AdaptiveFilter):
+        single = make()
+        batch = make()
+
+        expected = [single.process(v).processed_value for v in values]
+
+        assert _run_in_chunks(batch.process_batch, values) == pytest.approx(expected, rel=1e-12, abs=1e-12)
+
+
+def test_fuse_data_many_matches_fuse_data():
+    fusion = DataFusionProcessor()
+    fusion.set_sensor_weight("a", 0.9)
+    fusion.set_sensor_weight("b", 0.4)
+    fusion.update_sensor_reliability("c", 0.6)
+    names = ["a", "b", "c"]
+    rng = random.Random(14)
+    rows = [[rng.uniform(0, 50) for _ in names] for _ in range(200)]
+
+    expected = [fusion.fuse_data(dict(zip(names, row))) for row in rows]
+    fused, confidence = fusion.fuse_data_many(names, rows)
+
+    assert fused == pytest.approx([result.processed_value for result in expected], rel=1e-12)
+    assert confidence == expected[0].confidence
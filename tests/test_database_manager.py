@@ -0,0 +1,158 @@
+"""DatabaseManager 后台写入线程与分钟汇总统计的回归测试"""
+
+import random
+import sqlite3
+import time
+
+import pytest
+
+from eco_exoskeleton.database_manager import DatabaseManager
+
+
+def test_bad_row_does_not_drop_rest_of_batch(tmp_path):
+    """批量写入中一条违反约束的算法结果只丢弃它自己"""
+    db = DatabaseManager(str(tmp_path / "sensor_data.db"))
+    for i in range(20):
+        db.store_sensor_data("greenhouse", {"temperature": 20.0 + i}, 1000.0 + i)
+    db.store_algorithm_results_batch([
+        (1000.0, "kalman", "greenhouse", "temperature", original, 1.0, 0.5, {})
+        for original in (1.0, float("nan"), 2.0)
+    ])
+    for i in range(20):
+        db.store_sensor_data("greenhouse", {"temperature": 40.0 + i}, 1020.0 + i)
+    db.flush()
+
+    info = db.get_database_info()
+    assert info["sensor_data_count"] == 40
+    assert info["algorithm_results_count"] == 2
+
+
+def test_every_numeric_field_stored_and_strings_skipped(tmp_path):
+    """已知模块上报的新数值字段同样写入，数值字符串不写入"""
+    db = DatabaseManager(str(tmp_path / "sensor_data.db"))
+    db.store_sensor_data("greenhouse", {"temperature": 25.0, "light": 300, "humidity": "60.5"}, 1000.0)
+    db.flush()
+
+    stored = {row.data_type: row.value for row in db.get_sensor_data(module="greenhouse", include_raw=False)}
+    assert stored == {"temperature": 25.0, "light": 300.0}
+
+
+def _baseline_sensor_stats(db_path, start_time):
+    """直接对 sensor_data 做聚合查询（汇总表出现之前 get_statistics 的做法）"""
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute('''
+            SELECT module, data_type, COUNT(*), AVG(value), MIN(value), MAX(value)
+            FROM sensor_data
+            WHERE timestamp >= ? AND value IS NOT NULL
+            GROUP BY module, data_type
+        ''', (start_time,)).fetchall()
+    finally:
+        conn.close()
+    return {(row[0], row[1]): row[2:] for row in rows}
+
+
+def test_flush_waits_for_queued_writes(tmp_path):
+    """store_* 立即返回，flush 之后所有排队的写入都可查询到"""
+    db = DatabaseManager(str(tmp_path / "sensor_data.db"))
+    now = time.time()
+    for i in range(300):
+        assert db.store_sensor_data("injection", {"depth": float(i), "pressure": 1.5}, now + i * 0.01)
+    assert db.store_sensor_data_bulk([("bubble", {"flow_rate": 2.0}, now)] * 50)
+    assert db.store_algorithm_result(now, "kalman", "injection", "depth", 1.0, 1.1, 0.9, {"window": 5})
+
+    db.flush()
+
+    info = db.get_database_info()
+    assert info["sensor_data_count"] == 300 * 2 + 50
+    assert info["algorithm_results_count"] == 1
+
+
+def test_rollup_statistics_match_direct_query(tmp_path):
+    """分钟汇总表得出的统计与直接聚合 sensor_data 的结果一致"""
+    db_path = str(tmp_path / "sensor_data.db")
+    db = DatabaseManager(db_path)
+    rng = random.Random(0)
+    # 全部样本落在统计窗口内（跨越若干整分钟），避免窗口起点所在分钟的精度差异
+    base = time.time() - 3600
+    for i in range(400):
+        timestamp = base + i * 7.5
+        db.store_sensor_data("greenhouse", {
+            "temperature": rng.uniform(10, 35),
+            "humidity": rng.uniform(20, 90),
+            "deployed": rng.random() < 0.5,
+        }, timestamp)
+        if i % 3 == 0:
+            db.store_sensor_data("injection", {"depth": rng.uniform(0, 50)}, timestamp)
+    db.flush()
+
+    stats = db.get_statistics(hours_back=2)
+    expected = _baseline_sensor_stats(db_path, time.time() - 2 * 3600)
+
+    reported = {
+        (module, data_type): block
+        for module, fields in stats["sensor_data"].items()
+        for data_type, block in fields.items()
+    }
+    assert set(reported) == set(expected)
+    for key, (count, avg, minimum, maximum) in expected.items():
+        block = reported[key]
+        assert block["count"] == count
+        assert block["min"] == minimum
+        assert block["max"] == maximum
+        assert block["avg"] == pytest.approx(round(avg, 2), abs=0.01)
+    assert stats["summary"]["total_sensor_records"] == sum(row[0] for row in expected.values())
+
+
+def test_sensor_data_indexes_used_by_queries(tmp_path):
+    """sensor_data 只有两个二级索引，且各自被对应的查询使用"""
+    db_path = str(tmp_path / "sensor_data.db")
+    db = DatabaseManager(db_path)
+    db.store_sensor_data_bulk([
+        (module, {"temperature": float(i), "humidity": 50.0}, 1000.0 + i)
+        for i in range(200) for module in ("greenhouse", "injection")
+    ])
+    db.flush()
+
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("ANALYZE")
+        indexes = {row[1] for row in conn.execute("PRAGMA index_list(sensor_data)")
+                   if not row[1].startswith("sqlite_autoindex")}
+        assert indexes == {"idx_sensor_ts_cover", "idx_sensor_mod_type_ts"}
+
+        def plan(query, params):
+            return " ".join(row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + query, params))
+
+        select = "SELECT timestamp, module, data_type, value FROM sensor_data WHERE 1=1"
+        assert "idx_sensor_mod_type_ts" in plan(
+            select + " AND sensor_data.module = ? AND sensor_data.data_type = ?"
+            " ORDER BY sensor_data.timestamp DESC LIMIT ?", ("greenhouse", "temperature", 10))
+        assert "idx_sensor_ts_cover" in plan(
+            select + " AND sensor_data.timestamp >= ? ORDER BY sensor_data.timestamp DESC LIMIT ?", (1100.0, 10))
+        assert "idx_sensor_ts_cover" in plan(
+            "SELECT rowid FROM sensor_data WHERE timestamp < ? LIMIT ?", (1050.0, 100))
+    finally:
+        conn.close()
+
+
+def test_existing_database_converted_to_incremental_vacuum_by_cleanup(tmp_path):
+    """已有的非增量回收库在启动时不整库 VACUUM，由 cleanup_old_data 完成切换"""
+    db_path = str(tmp_path / "sensor_data.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE legacy (id INTEGER PRIMARY KEY)")
+    conn.commit()
+    conn.close()
+
+    db = DatabaseManager(db_path)
+    assert db._conn().execute("PRAGMA auto_vacuum").fetchone()[0] == 0
+
+    result = db.cleanup_old_data(days_to_keep=30)
+
+    assert result["vacuumed"] is True
+    assert db._conn().execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+
+
+def test_new_database_uses_incremental_vacuum(tmp_path):
+    db = DatabaseManager(str(tmp_path / "sensor_data.db"))
+    assert db._conn().execute("PRAGMA auto_vacuum").fetchone()[0] == 2
@@ -0,0 +1,108 @@
+"""MQTTManager 消息处理与控制循环交接的回归测试"""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from eco_exoskeleton.config import TOPIC_GREENHOUSE_SENSORS, TOPIC_GREENHOUSE_STATUS
+from eco_exoskeleton.models import SensorData
+from eco_exoskeleton.mqtt_manager import MQTTManager
+
+
+class _FakeDecisionSystem:
+    def __init__(self):
+        self.sensor_updates = []
+        self.status_updates = []
+
+    def update_sensor_data(self, sensor_data):
+        self.sensor_updates.append(sensor_data)
+
+    def update_module_status(self, status):
+        self.status_updates.append(status)
+
+
+def test_sensor_data_is_read_only_snapshot():
+    """sensor_data 不能赋值，修改返回的快照不影响管理器"""
+    manager = MQTTManager(_FakeDecisionSystem())
+    manager._process_greenhouse_sensors({"temperature": 30.0, "humidity": 40.0})
+
+    with pytest.raises(AttributeError):
+        manager.sensor_data = SensorData()
+
+    snapshot = manager.sensor_data
+    snapshot.temperature = -1.0
+    assert manager.sensor_data.temperature == 30.0
+    assert manager.sensor_data is not snapshot
+
+
+def test_sensor_messages_collapse_into_one_update():
+    """两次 drain 之间的多条传感器消息合并为一次推送，各模块读数互不覆盖"""
+    decision = _FakeDecisionSystem()
+    manager = MQTTManager(decision)
+
+    manager._process_greenhouse_sensors({"temperature": 21.0, "humidity": 45.0})
+    manager._process_injection_sensors({"soil_moisture": 33.0, "current_depth": 12.0})
+    manager._process_greenhouse_sensors({"temperature": 22.5, "humidity": 47.0})
+    manager._process_bubble_sensors({"flow_rate": 3.5})
+
+    assert manager.drain_sensor_update() is True
+    assert len(decision.sensor_updates) == 1
+    update = decision.sensor_updates[0]
+    assert (update.temperature, update.humidity) == (22.5, 47.0)
+    assert (update.soil_moisture, update.injection_depth) == (33.0, 12.0)
+    assert update.bubble_flow == 3.5
+
+
+def test_dirty_flag_clears_after_drain():
+    """drain 之后没有新消息时不再推送，收到新消息后再次推送"""
+    decision = _FakeDecisionSystem()
+    manager = MQTTManager(decision)
+
+    assert manager.drain_sensor_update() is False
+    manager._process_bubble_sensors({"flow_rate": 1.0})
+    assert manager.drain_sensor_update() is True
+    assert manager.drain_sensor_update() is False
+    manager._process_bubble_sensors({"flow_rate": 2.0})
+    assert manager.drain_sensor_update() is True
+
+    assert [update.bubble_flow for update in decision.sensor_updates] == [1.0, 2.0]
+
+
+def test_status_updates_delivered_in_order():
+    """各模块状态消息按到达顺序交给决策系统，drain 之后收件箱为空"""
+    decision = _FakeDecisionSystem()
+    manager = MQTTManager(decision)
+
+    manager._process_greenhouse_status({"state": "DEPLOYING", "message": "a", "timestamp": 1.0})
+    manager._process_injection_status({"state": "INJECTING", "message": "b", "timestamp": 2.0, "depth": 5})
+    manager._process_bubble_status({"state": "SPRAYING", "message": "c", "timestamp": 3.0})
+    manager._process_greenhouse_status({"state": "IDLE", "message": "d", "timestamp": 4.0})
+
+    assert manager.drain_status_updates() == 4
+    assert [(s.module, s.state.value, s.timestamp) for s in decision.status_updates] == [
+        ("greenhouse", "DEPLOYING", 1.0),
+        ("injection", "INJECTING", 2.0),
+        ("bubble", "SPRAYING", 3.0),
+        ("greenhouse", "IDLE", 4.0),
+    ]
+    assert decision.status_updates[1].data == {"depth": 5, "pressure": 0}
+    assert manager.drain_status_updates() == 0
+
+
+def test_messages_routed_by_topic_to_control_loop_handoff():
+    """经 _on_message 到达的 JSON 消息进入同一交接路径，由 drain 取出"""
+    decision = _FakeDecisionSystem()
+    manager = MQTTManager(decision)
+
+    def deliver(topic, payload):
+        manager._on_message(None, None, SimpleNamespace(topic=topic, payload=json.dumps(payload).encode()))
+
+    deliver(TOPIC_GREENHOUSE_SENSORS, {"temperature": 26.0, "humidity": 55.0})
+    deliver(TOPIC_GREENHOUSE_SENSORS, {"temperature": 27.0, "humidity": 56.0})
+    deliver(TOPIC_GREENHOUSE_STATUS, {"state": "DEPLOYING", "message": "x", "timestamp": 1.0})
+
+    assert decision.sensor_updates == [] and decision.status_updates == []
+    assert manager.drain_status_updates() == 1
+    assert manager.drain_sensor_update() is True
+    assert decision.sensor_updates[0].temperature == 27.0